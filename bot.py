@@ -7,7 +7,13 @@ import sys
 import os
 from config import Config
 from utils.cache import cache
+from utils.translator import translator
+from utils.detection import detector
 from utils.database import Database
+from utils.translation_store import translation_store
+from utils.rate_limit import RateLimited
+from utils.tts import tts
+from utils.scheduler import scheduler
 
 # Logging Setup
 logging.basicConfig(
@@ -40,10 +46,21 @@ class TranslatorBot(commands.Bot):
         logger.info("🚀 Starting bot...")
         
         await cache.connect()
+        await translator.start()
+        await detector.start()
+        await tts.start()
+        await scheduler.start()
         
         self.db = Database(Config.DB_PATH)
         await self.db.connect()
+
+        if Config.TRANSLATION_STORE["enabled"]:
+            await translation_store.start(self.db)
+            cache.attach_store(translation_store)
+            hot = await translation_store.hottest(Config.TRANSLATION_STORE["warm_entries"])
+            logger.info(f"🔥 Warmed cache with {await cache.warm(hot)} translations")
         
+        self.tree.on_error = self.on_app_command_error
         await self.load_cogs()
         
         logger.info("✅ Bot ready!")
@@ -51,6 +68,7 @@ class TranslatorBot(commands.Bot):
     async def load_cogs(self):
         cogs = [
             "cogs.translation",
+            "cogs.auto_translate",
             "cogs.settings",
             "cogs.word_of_day",
             "cogs.quiz",
@@ -68,13 +86,28 @@ class TranslatorBot(commands.Bot):
                 import traceback
                 traceback.print_exc()
 
+    async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        if isinstance(error, RateLimited):
+            if interaction.response.is_done():
+                await interaction.followup.send(str(error), ephemeral=True)
+            else:
+                await interaction.response.send_message(str(error), ephemeral=True)
+            return
+        command = interaction.command.name if interaction.command else "unknown"
+        logger.error(f"❌ Error in /{command}: {error}", exc_info=error)
+
     async def on_ready(self):
         logger.info(f"✅ Logged in as {self.user} (ID: {self.user.id})")
         await self.tree.sync()
     
     async def close(self):
         logger.info("🛑 Shutting down...")
+        await translation_store.close()
         await cache.close()
+        await translator.close()
+        await detector.close()
+        await tts.close()
+        await scheduler.close()
         await self.db.close()
         await super().close()
 
@@ -3,9 +3,17 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
-from typing import Optional
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Dict, Optional
 from config import Config
 from utils.cache import cache
+from utils.detection import detector
+from utils.metrics import metrics
+from utils.translator import translator
+from utils.rate_limit import rate_limit
 
 logger = logging.getLogger('TranslatorBot')
 
@@ -18,6 +26,7 @@ class Admin(commands.Cog):
         return ctx.author.id == Config.OWNER_ID or ctx.author.guild_permissions.administrator
 
     @app_commands.command(name="admin_setup", description="Initial server setup (Channels, Roles)")
+    @rate_limit("default")
     @app_commands.checks.has_permissions(administrator=True)
     async def setup_server(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
@@ -82,31 +91,155 @@ class Admin(commands.Cog):
         await interaction.followup.send("\n".join(status_msg), ephemeral=True)
 
     @app_commands.command(name="set_word_channel", description="Set channel for Word of the Day")
+    @rate_limit("default")
     @app_commands.checks.has_permissions(manage_channels=True)
     async def set_word_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         # Save to DB
         await interaction.response.send_message(f"✅ Word of Day channel set to {channel.mention}", ephemeral=True)
 
     @app_commands.command(name="translate_history", description="Mass translate recent messages (Mod Only)")
+    @rate_limit("default")
+    @app_commands.describe(count="Number of recent messages", target="Target language code (en, ru, ko, etc)")
     @app_commands.checks.has_permissions(manage_messages=True)
     async def translate_history(self, interaction: discord.Interaction, count: int, target: str):
-        if count > 100: count = 100
+        settings = Config.HISTORY_TRANSLATION
+        count = max(1, min(count, settings["max_messages"]))
         await interaction.response.defer(ephemeral=True)
-        
-        messages = []
-        async for msg in interaction.channel.history(limit=count):
-            if msg.content:
-                messages.append(f"[{msg.author}] {msg.content}")
-        
-        # Logic to translate them all and save to file
-        report = f"Translated {len(messages)} messages to {target}.\n\n" + "\n".join(messages)
-        
-        # Mock file
-        import io
-        fp = io.BytesIO(report.encode('utf-8'))
-        file = discord.File(fp, filename="translation_report.txt")
-        
-        await interaction.followup.send(content="✅ Report generated:", file=file, ephemeral=True)
+
+        fd, path = tempfile.mkstemp(prefix="translation_report_", suffix=".txt")
+        os.close(fd)
+        try:
+            stats = await self._translate_history_to_file(interaction, count, target, path)
+            await interaction.edit_original_response(
+                content=f"✅ Translated {stats['translated']} messages to {target} "
+                        f"({stats['unique']} unique, {stats['failed']} failed)."
+            )
+            await interaction.followup.send(
+                content="📄 Report:",
+                file=discord.File(path, filename="translation_report.txt"),
+                ephemeral=True
+            )
+        except Exception as e:
+            logger.error(f"History translation error: {e}")
+            await interaction.followup.send("❌ Failed to translate channel history.", ephemeral=True)
+        finally:
+            os.remove(path)
+
+    async def _translate_history_to_file(self, interaction: discord.Interaction, count: int, target: str, path: str) -> dict:
+        """Stream channel history through detection + translation, writing results in order as they arrive"""
+        settings = Config.HISTORY_TRANSLATION
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings["concurrency"] * 4)
+        results: Dict[int, str] = {}  # reorder buffer
+        # Messages read but not yet written; a slow one holds back reading instead of growing `results`
+        window = asyncio.Semaphore(settings["concurrency"] * 5)
+        stats = {"read": 0, "translated": 0, "failed": 0, "unique": 0}
+        seen = set()
+        done_reading = asyncio.Event()
+        result_ready = asyncio.Event()
+
+        async def produce():
+            try:
+                async for msg in interaction.channel.history(limit=count):
+                    if not msg.content:
+                        continue
+                    digest = hashlib.blake2b(msg.content.encode(), digest_size=8).digest()
+                    if digest not in seen:
+                        seen.add(digest)
+                        stats["unique"] += 1
+                    await window.acquire()
+                    await queue.put((stats["read"], msg.created_at, str(msg.author), msg.content))
+                    stats["read"] += 1
+            finally:
+                done_reading.set()
+                result_ready.set()
+                for _ in range(settings["concurrency"]):
+                    await queue.put(None)
+
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, created_at, author, content = item
+                try:
+                    # Repeated texts are coalesced in flight and then served from the cache
+                    source = await detector.detect(content)
+                    translated, _ = await translator.translate_cached(content, target, detected=source)
+                    stats["translated"] += 1
+                except Exception as e:
+                    source, translated = "?", f"[translation failed: {e}]"
+                    stats["failed"] += 1
+                results[index] = (
+                    f"[{created_at:%Y-%m-%d %H:%M}] {author} ({source} → {target}):\n"
+                    f"    {content}\n    → {translated}\n\n"
+                )
+                result_ready.set()
+
+        async def report_progress():
+            while True:
+                await asyncio.sleep(settings["progress_interval"])
+                done = stats["translated"] + stats["failed"]
+                try:
+                    await interaction.edit_original_response(content=f"⏳ Translated {done}/{count} messages to {target}...")
+                except discord.HTTPException:
+                    pass
+
+        with open(path, "w", encoding="utf-8") as report:
+            header = f"Translation of the last {count} messages in #{interaction.channel} to {target}\n\n"
+            await asyncio.to_thread(report.write, header)
+
+            producer = asyncio.create_task(produce())
+            workers = [asyncio.create_task(work()) for _ in range(settings["concurrency"])]
+            progress = asyncio.create_task(report_progress())
+            try:
+                next_index = 0
+                while not (done_reading.is_set() and next_index >= stats["read"]):
+                    await result_ready.wait()
+                    result_ready.clear()
+                    chunk = []
+                    while next_index in results:
+                        chunk.append(results.pop(next_index))
+                        next_index += 1
+                        window.release()
+                    if chunk:
+                        await asyncio.to_thread(report.write, "".join(chunk))
+                await asyncio.gather(producer, *workers)
+            finally:
+                for task in [producer, progress, *workers]:
+                    task.cancel()
+
+        return stats
+
+    @app_commands.command(name="admin_metrics", description="Show internal performance counters")
+    @rate_limit("default")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def admin_metrics(self, interaction: discord.Interaction):
+        snapshot = metrics.snapshot()
+        if not snapshot:
+            await interaction.response.send_message("No metrics recorded yet.", ephemeral=True)
+            return
+
+        lines = [f"{name}: {value}" for name, value in sorted(snapshot.items())]
+        report = "\n".join(lines)
+        if len(report) > 1900:
+            report = report[:1900] + "\n..."
+        await interaction.response.send_message(f"```\n{report}\n```", ephemeral=True)
+
+    @app_commands.command(name="admin_build_vocabulary", description="Translate quiz words that are missing from the offline vocabulary")
+    @rate_limit("default")
+    @app_commands.describe(full="Retranslate every word instead of only the missing ones")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def admin_build_vocabulary(self, interaction: discord.Interaction, full: bool = False):
+        quiz = self.bot.get_cog("Quiz")
+        if quiz is None:
+            await interaction.response.send_message("❌ Quiz is not loaded.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        added = await quiz.vocabulary.build(full=full)
+        await interaction.followup.send(
+            f"✅ Vocabulary updated: {added} new translations, {len(quiz.vocabulary)} total.", ephemeral=True
+        )
 
 async def setup(bot):
     await bot.add_cog(Admin(bot))
@@ -0,0 +1,181 @@
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from config import Config
+from utils.detection import detector
+from utils.metrics import metrics
+from utils.translator import translator
+from utils.rate_limit import rate_limit
+
+logger = logging.getLogger('TranslatorBot')
+
+class AutoTranslate(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.channels: Dict[int, List[str]] = {}  # channel_id: target languages
+        self.webhooks: Dict[int, discord.Webhook] = {}
+        self._buffers: Dict[int, List[discord.Message]] = {}
+        self._last_message: Dict[int, float] = {}
+        self._flush_tasks: Dict[int, asyncio.Task] = {}
+
+    async def cog_load(self):
+        if self.bot.db:
+            self.channels = await self.bot.db.get_auto_translate_channels()
+        logger.info(f"Auto-translate enabled in {len(self.channels)} channels")
+
+    async def cog_unload(self):
+        for task in self._flush_tasks.values():
+            task.cancel()
+
+    @app_commands.command(name="autotranslate_set", description="Auto-translate every message in a channel")
+    @rate_limit("default")
+    @app_commands.describe(channel="Channel to translate", targets="Comma-separated language codes, e.g. en,ru,ko")
+    @app_commands.checks.has_permissions(manage_channels=True)
+    async def autotranslate_set(self, interaction: discord.Interaction, channel: discord.TextChannel, targets: str):
+        codes = list(dict.fromkeys(code.strip().lower() for code in targets.split(",") if code.strip()))
+        unknown = [code for code in codes if code not in Config.SUPPORTED_LANGUAGES]
+        max_targets = Config.AUTO_TRANSLATE["max_targets"]
+
+        if not codes or unknown:
+            supported = ", ".join(Config.SUPPORTED_LANGUAGES)
+            await interaction.response.send_message(f"❌ Unknown language codes. Supported: {supported}", ephemeral=True)
+            return
+        if len(codes) > max_targets:
+            await interaction.response.send_message(f"❌ At most {max_targets} target languages per channel.", ephemeral=True)
+            return
+
+        await self.bot.db.set_auto_translate_channel(channel.id, interaction.guild_id, codes)
+        self.channels[channel.id] = codes
+        flags = " ".join(Config.SUPPORTED_LANGUAGES[code]["flag"] for code in codes)
+        await interaction.response.send_message(f"✅ Messages in {channel.mention} will be translated to {flags}", ephemeral=True)
+
+    @app_commands.command(name="autotranslate_off", description="Stop auto-translating a channel")
+    @rate_limit("default")
+    @app_commands.checks.has_permissions(manage_channels=True)
+    async def autotranslate_off(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        await self.bot.db.remove_auto_translate_channel(channel.id)
+        self.channels.pop(channel.id, None)
+        self.webhooks.pop(channel.id, None)
+        await interaction.response.send_message(f"✅ Auto-translate disabled in {channel.mention}", ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if not Config.FEATURES["auto_translate_enabled"]:
+            return
+        if message.author.bot or message.webhook_id or not message.content:
+            return
+        if message.channel.id not in self.channels:
+            return
+
+        # Debounce: bursts in a channel are detected and posted together
+        channel_id = message.channel.id
+        self._buffers.setdefault(channel_id, []).append(message)
+        self._last_message[channel_id] = asyncio.get_running_loop().time()
+        if channel_id not in self._flush_tasks:
+            self._flush_tasks[channel_id] = asyncio.create_task(self._flush_later(channel_id))
+
+    async def _flush_later(self, channel_id: int):
+        settings = Config.AUTO_TRANSLATE
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            while True:
+                await asyncio.sleep(settings["debounce"])
+                now = loop.time()
+                if now - self._last_message[channel_id] >= settings["debounce"] or now - started >= settings["max_delay"]:
+                    break
+        finally:
+            self._flush_tasks.pop(channel_id, None)
+
+        messages = self._buffers.pop(channel_id, [])
+        try:
+            await self._translate_burst(channel_id, messages)
+        except Exception as e:
+            logger.error(f"Auto-translate error in {channel_id}: {e}")
+
+    async def _translate_burst(self, channel_id: int, messages: List[discord.Message]):
+        targets = self.channels.get(channel_id)
+        if not targets or not messages:
+            return
+
+        # One detection per message, for the whole burst at once
+        sources = await detector.detect_many([msg.content for msg in messages])
+        results = await asyncio.gather(*(
+            self._translate_message(msg, source, targets)
+            for msg, source in zip(messages, sources)
+        ), return_exceptions=True)
+        for msg, result in zip(messages, results):
+            if isinstance(result, Exception):
+                logger.error(f"Auto-translate of message {msg.id} failed: {result}")
+
+    async def _translate_message(self, message: discord.Message, source: str, targets: List[str]):
+        targets = [target for target in targets if target != source]
+        if not targets:
+            return
+
+        # Fan out to every target concurrently through the cache
+        results = await asyncio.gather(*(
+            translator.translate_cached(message.content, target, detected=source)
+            for target in targets
+        ), return_exceptions=True)
+
+        lines = []
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Auto-translate to {target} failed: {result}")
+                continue
+            flag = Config.SUPPORTED_LANGUAGES[target]["flag"]
+            lines.append(f"{flag} {result[0]}")
+        if not lines:
+            return
+
+        metrics.incr("auto_translate.messages")
+        await self._post(message, "\n".join(lines)[:2000])
+
+    async def _post(self, message: discord.Message, content: str):
+        """One webhook message per source message, shown under the author's name"""
+        webhook = await self._get_webhook(message.channel)
+        if webhook is not None:
+            try:
+                await webhook.send(
+                    content,
+                    username=message.author.display_name,
+                    avatar_url=message.author.display_avatar.url,
+                    allowed_mentions=discord.AllowedMentions.none()
+                )
+                return
+            except (ValueError, discord.HTTPException) as e:
+                # Deleted, lost its token or otherwise unusable: look it up again next time
+                logger.warning(f"Webhook in {message.channel.id} failed, replying instead: {e}")
+                self.webhooks.pop(message.channel.id, None)
+        await message.reply(content, mention_author=False, allowed_mentions=discord.AllowedMentions.none())
+
+    async def _get_webhook(self, channel: discord.abc.Messageable) -> Optional[discord.Webhook]:
+        if not isinstance(channel, discord.TextChannel):
+            return None
+        webhook = self.webhooks.get(channel.id)
+        if webhook:
+            return webhook
+        try:
+            name = Config.AUTO_TRANSLATE["webhook_name"]
+            existing = await channel.webhooks()
+            # Only our own webhooks, and only with a token we can send with
+            webhook = discord.utils.find(
+                lambda w: w.name == name and w.token and w.user == self.bot.user, existing
+            )
+            if webhook is None:
+                webhook = await channel.create_webhook(name=name)
+        except discord.Forbidden:
+            return None
+        except (ValueError, discord.HTTPException) as e:
+            logger.warning(f"No webhook in {channel.id}, replying instead: {e}")
+            return None
+        self.webhooks[channel.id] = webhook
+        return webhook
+
+async def setup(bot):
+    await bot.add_cog(AutoTranslate(bot))
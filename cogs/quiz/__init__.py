@@ -3,33 +3,69 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
-from typing import Literal, Optional
-import random
 import asyncio
-from deep_translator import GoogleTranslator
-from deep_translator import GoogleTranslator
+from typing import Literal, Optional
 from config import Config
+from utils.rate_limit import rate_limit
+from utils.achievements import achievements
+from utils.scheduler import scheduler
 from cogs.quiz.database import QuizDatabase
-from cogs.quiz.quiz_data import (
-    get_random_word, get_all_words_except, DIFFICULTY_POINTS, 
-    STREAK_BONUS, get_xp_for_next_level
-)
+from cogs.quiz.question_pool import QuestionPool
+from cogs.quiz.vocabulary import Vocabulary
+from cogs.quiz.ranking import Ranking
+from cogs.quiz.leaderboard import LeaderboardSnapshots
+from cogs.quiz.quiz_data import ACHIEVEMENTS, DIFFICULTY_POINTS, get_xp_for_next_level
 import time
 
 logger = logging.getLogger('TranslatorBot')
 
+QUESTION_TIMEOUT = 30       # seconds to answer
+NEXT_QUESTION_DELAY = 2     # seconds before the next solo question
+LEADERBOARD_TIMEOUT = 300   # seconds the leaderboard buttons stay active
+
+def register_achievements():
+    for name, stat, threshold in ACHIEVEMENTS:
+        achievements.register(name, f"quiz.{stat}", threshold)
+    achievements.register(
+        "💯 Perfectionist", "quiz.correct_answers", 10,
+        condition=lambda values: values.get("quiz.accuracy") == 100
+    )
+
+def achievement_values(stats: dict) -> dict:
+    """Quiz stats as achievement metrics"""
+    return {
+        f"quiz.{stat}": stats[stat]
+        for stat in ("total_questions", "correct_answers", "best_streak", "level", "accuracy")
+    }
+
 class Quiz(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = QuizDatabase()
+        self.vocabulary = Vocabulary()
+        self.pool = QuestionPool(self.vocabulary)
+        self.ranking = Ranking(self.db)
+        self.snapshots = LeaderboardSnapshots(bot, self.db, self.ranking)
         self.active_multiplayer_games = {}  # channel_id: game_data
         
     async def cog_load(self):
-        """Initialize database when cog loads"""
-        await self.db.initialize()
+        """Open the database connection when cog loads"""
+        await self.db.connect()
+        register_achievements()
+        achievements.attach(self.db)
+        await self.vocabulary.load()
+        self.pool.start()
+        self.snapshots.start()
         logger.info("Quiz database initialized")
 
+    async def cog_unload(self):
+        self.pool.close()
+        self.snapshots.close()
+        achievements.detach(self.db)
+        await self.db.close()
+
     @app_commands.command(name="quiz", description="Start a language quiz with leveling system")
+    @rate_limit("quiz")
     @app_commands.describe(
         mode="Solo or Multiplayer mode",
         language="Target language to practice",
@@ -54,19 +90,9 @@ class Quiz(commands.Cog):
         # Get user data
         user = await self.db.get_user(interaction.user.id, interaction.user.name)
         
-        # Generate question
-        word, category = get_random_word(difficulty)
-        
+        # Ready-made question from the background pool
         try:
-            # Correct answer
-            correct_translation = GoogleTranslator(source='en', target=language).translate(word)
-            
-            # Wrong answers
-            wrong_words = get_all_words_except(difficulty, word, 3)
-            wrong_translations = [
-                GoogleTranslator(source='en', target=language).translate(w) 
-                for w in wrong_words
-            ]
+            question = await self.pool.get(language, difficulty)
         except Exception as e:
             logger.error(f"Quiz generation error: {e}")
             msg = "❌ Failed to generate quiz. Try again."
@@ -76,10 +102,9 @@ class Quiz(commands.Cog):
                 await interaction.followup.send(msg, ephemeral=True)
             return
 
-        # Prepare options
-        options = [correct_translation] + wrong_translations
-        random.shuffle(options)
-        correct_index = options.index(correct_translation)
+        word, category = question.word, question.category
+        options, correct_index = question.options, question.correct_index
+        correct_translation = question.correct_translation
         
         # Calculate potential XP
         base_xp = DIFFICULTY_POINTS[difficulty]
@@ -104,7 +129,7 @@ class Quiz(commands.Cog):
             value=f"Base: **{base_xp} XP** {'+ Streak bonus!' if user['current_streak'] >= 3 else ''}",
             inline=False
         )
-        embed.set_footer(text=f"Category: {category.replace('_', ' ').title()} | ⏱️ You have 30 seconds!")
+        embed.set_footer(text=f"Category: {category.replace('_', ' ').title()} | ⏱️ You have {QUESTION_TIMEOUT} seconds!")
         
         # Multiplayer mode logic (stripped for brevity, re-add if needed, but focused on solo flow now)
         if mode == "multiplayer":
@@ -138,31 +163,30 @@ class Quiz(commands.Cog):
         else:
              await interaction.followup.send(embed=embed, view=view, ephemeral=(mode == "solo"))
         
-        # Auto-disable after timeout
-        await asyncio.sleep(30)
-        # Check if view still active/same question
-        # This simple timeout logic might conflict with next questions in same message, 
-        # but since we create NEW View instance each time, it should be fine.
-        if not view.answered:
-            view.stop()
-            for item in view.children:
-                item.disabled = True
-            
-            timeout_embed = discord.Embed(
-                title="⏱️ Time's Up!",
-                description=f"The correct answer was: **{correct_translation}**",
-                color=0xe74c3c
-            )
-            try:
-                if mode == "solo":
-                    # Check if we haven't already moved to next question
-                    await interaction.edit_original_response(embed=timeout_embed, view=None)
-                else:
-                    await interaction.channel.send(embed=timeout_embed)
-            except:
-                pass
+        # Auto-disable after timeout; cancelled when a solo question is answered
+        if view.timeout is None:
+            view.deadline = scheduler.schedule(QUESTION_TIMEOUT, self.question_timeout, view, force=True)
+
+    async def question_timeout(self, view: "QuizView"):
+        view.stop()
+        if view.answered:
+            return
+        
+        timeout_embed = discord.Embed(
+            title="⏱️ Time's Up!",
+            description=f"The correct answer was: **{view.correct_word}**",
+            color=0xe74c3c
+        )
+        try:
+            if view.mode == "solo":
+                await view.interaction.edit_original_response(embed=timeout_embed, view=None)
+            else:
+                await view.interaction.channel.send(embed=timeout_embed)
+        except:
+            pass
 
     @app_commands.command(name="profile", description="View your quiz profile and statistics")
+    @rate_limit("default")
     async def profile(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
         target_user = user or interaction.user
         
@@ -191,9 +215,10 @@ class Quiz(commands.Cog):
             inline=True
         )
         
+        rank = await self.ranking.rank("xp", target_user.id)
         embed.add_field(
             name="🏆 Global Rank",
-            value=f"**#{stats['rank']}**",
+            value=f"**#{rank}**" if rank else "*Unranked*",
             inline=True
         )
         
@@ -227,48 +252,74 @@ class Quiz(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="leaderboard", description="View the top quiz players")
-    @app_commands.describe(by="Sort by XP or Best Streak")
+    @rate_limit("default")
+    @app_commands.describe(
+        board="XP (all time, this server, this week or month), best streak, or XP in one language",
+        language="Language for the language board"
+    )
+    @app_commands.choices(language=[
+        app_commands.Choice(name=lang_data["name"], value=code)
+        for code, lang_data in Config.SUPPORTED_LANGUAGES.items()
+    ])
     async def leaderboard(
         self, 
         interaction: discord.Interaction,
-        by: Literal["xp", "streak"] = "xp"
+        board: Literal["xp", "streak", "server", "week", "month", "language"] = "xp",
+        language: Optional[str] = None
     ):
-        await interaction.response.defer()
-        
-        leaders = await self.db.get_leaderboard(limit=10, by=by)
+        if board == "server" and not interaction.guild_id:
+            await interaction.response.send_message("❌ The server leaderboard only works in a server!", ephemeral=True)
+            return
+        if board == "language" and not language:
+            await interaction.response.send_message("❌ Pick a language for the language leaderboard!", ephemeral=True)
+            return
         
-        if not leaders:
-            await interaction.followup.send("No players yet! Be the first to take a quiz!")
+        board_name = Ranking.current_board(board, interaction.guild_id, language)
+        # Usually answered straight from the snapshot; only a board nobody viewed lately is built now
+        snapshot = self.snapshots.peek(board_name)
+        if snapshot is None:
+            await interaction.response.defer()
+            snapshot = await self.snapshots.get(board_name)
+        
+        if not snapshot.entries:
+            message = "No players yet! Be the first to take a quiz!"
+            if interaction.response.is_done():
+                await interaction.followup.send(message)
+            else:
+                await interaction.response.send_message(message)
             return
         
-        embed = discord.Embed(
-            title=f"🏆 Top 10 Players {'(by XP)' if by == 'xp' else '(by Streak)'}",
-            color=0xf39c12
-        )
+        view = LeaderboardView(self, board, board_name, language)
+        embed = view.show_snapshot(snapshot)
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, view=view)
+        else:
+            await interaction.response.send_message(embed=embed, view=view)
+        if view.timeout is None:
+            view.deadline = scheduler.schedule(LEADERBOARD_TIMEOUT, view.stop, force=True)
+
+    def leaderboard_embed(self, title: str, kind: str, entries: list, first_rank: int) -> discord.Embed:
+        """One leaderboard page; entries come from LeaderboardSnapshots in rank order"""
+        embed = discord.Embed(title=title, color=0xf39c12)
         
         medals = ["🥇", "🥈", "🥉"]
         
         leaderboard_text = ""
-        for i, player in enumerate(leaders, 1):
+        for i, entry in enumerate(entries, first_rank):
             medal = medals[i-1] if i <= 3 else f"**{i}.**"
             
-            if by == "xp":
-                stat = f"Level {player['level']} • {player['xp']} XP"
+            if kind == "xp":
+                stat = f"Level {entry['level']} • {entry['score']} XP"
+            elif kind == "streak":
+                stat = f"Streak: {entry['score']} 🔥"
             else:
-                stat = f"Streak: {player['best_streak']} 🔥"
-            
-            try:
-                user = await self.bot.fetch_user(player['user_id'])
-                username = user.name
-            except:
-                username = player['username'] or "Unknown"
+                stat = f"{entry['score']} XP"
             
-            leaderboard_text += f"{medal} **{username}**\n{stat}\n\n"
+            leaderboard_text += f"{medal} **{entry['username']}**\n{stat}\n\n"
         
         embed.description = leaderboard_text
         embed.set_footer(text="Keep practicing to climb the ranks!")
-        
-        await interaction.followup.send(embed=embed)
+        return embed
 
     def _get_difficulty_color(self, difficulty: str) -> int:
         colors = {
@@ -296,7 +347,8 @@ class QuizView(discord.ui.View):
         is_multiplayer: bool = False,
         game_data: dict = None
     ):
-        super().__init__(timeout=30)
+        # Timed out by Quiz.question_timeout through the shared scheduler, or by discord.py if it is full
+        super().__init__(timeout=None if scheduler.has_room() else QUESTION_TIMEOUT)
         self.cog = cog
         self.interaction = interaction
         self.db = db
@@ -311,6 +363,7 @@ class QuizView(discord.ui.View):
         self.game_data = game_data
         self.answered = False
         self.start_time = time.time()
+        self.deadline = None
         
         # Create buttons
         for i, option in enumerate(options):
@@ -322,6 +375,9 @@ class QuizView(discord.ui.View):
             button.callback = self.check_answer
             self.add_item(button)
 
+    async def on_timeout(self):
+        await self.cog.question_timeout(self)
+
     async def check_answer(self, interaction: discord.Interaction):
         # Prevent double answers in solo mode
         if not self.is_multiplayer and self.answered:
@@ -335,6 +391,11 @@ class QuizView(discord.ui.View):
                 return
         
         self.answered = True
+        if not self.is_multiplayer:
+            # Solo questions end on the first answer; multiplayer ones stay open until the deadline
+            if self.deadline:
+                self.deadline.cancel()
+            self.stop()
         selected_index = int(interaction.data["custom_id"])
         is_correct = (selected_index == self.correct_index)
         
@@ -342,38 +403,26 @@ class QuizView(discord.ui.View):
         time_taken = time.time() - self.start_time
         time_bonus = max(0, int(5 - (time_taken / 6)))  # 0-5 bonus XP
         
-        # Calculate XP
+        # XP, streak, counters and history in one transaction; the streak bonus is added there
         base_xp = DIFFICULTY_POINTS[self.difficulty]
-        
-        # Get user stats for streak bonus
-        user = await self.db.get_user(interaction.user.id, interaction.user.name)
-        streak_xp = 0
-        
-        if is_correct:
-            # Check streak bonuses
-            current_streak = user['current_streak']
-            for streak_req, bonus in sorted(STREAK_BONUS.items()):
-                if current_streak + 1 >= streak_req:
-                    streak_xp = bonus
-        
-        total_xp = (base_xp + time_bonus + streak_xp) if is_correct else 0
-        
-        # Update database
-        stats = await self.db.update_user_stats(interaction.user.id, total_xp, is_correct)
-        await self.db.add_quiz_history(
+        stats = await self.db.record_answer(
             interaction.user.id,
+            interaction.user.name,
             self.language,
             self.difficulty,
             self.original_word,
             self.correct_word,
             self.children[selected_index].label,
             is_correct,
-            total_xp
+            base_xp + time_bonus,
+            boards=Ranking.boards_for(interaction.guild_id, self.language)
         )
+        total_xp, streak_xp = stats['xp_gained'], stats['streak_xp']
+        await self.cog.ranking.publish(interaction.user.id, stats['scores'])
+        self.cog.snapshots.scores_changed(stats['scores'])
         
         # Check achievements
-        user_stats = await self.db.get_user_stats(interaction.user.id)
-        new_achievements = await self.db.check_achievements(interaction.user.id, user_stats)
+        new_achievements = await achievements.update(interaction.user.id, achievement_values(stats))
         
         # Disable all buttons and colorize
         for item in self.children:
@@ -393,19 +442,19 @@ class QuizView(discord.ui.View):
             if time_bonus > 0:
                 description += f" (⚡ +{time_bonus} speed bonus)"
             if streak_xp > 0:
-                description += f"\n🔥 **Streak Bonus: +{streak_xp} XP** ({stats['new_streak']} in a row!)"
+                description += f"\n🔥 **Streak Bonus: +{streak_xp} XP** ({stats['current_streak']} in a row!)"
                 
-            footer_text = "✨ Loading next question in 2s..."
+            footer_text = f"✨ Loading next question in {NEXT_QUESTION_DELAY}s..."
         else:
             title = "❌ Incorrect!"
             color = 0xe74c3c
             description = f"The correct answer was: **{self.correct_word}**\n\n"
-            description += f"💔 Streak reset: {user['current_streak']} → 0"
+            description += f"💔 Streak reset: {stats['old_streak']} → 0"
             footer_text = "Game Over (Incorrect Answer)"
         
         # Level up notification
         if stats['level_up']:
-            description += f"\n\n🎉 **LEVEL UP!** {stats['old_level']} → {stats['new_level']}"
+            description += f"\n\n🎉 **LEVEL UP!** {stats['old_level']} → {stats['level']}"
         
         # Achievement notifications
         if new_achievements:
@@ -413,7 +462,7 @@ class QuizView(discord.ui.View):
             description += "\n".join(new_achievements)
         
         # Progress bar
-        current_level, next_level_xp, xp_needed = get_xp_for_next_level(stats['new_xp'])
+        current_level, next_level_xp, xp_needed = get_xp_for_next_level(stats['xp'])
         if xp_needed:
             description += f"\n\n📊 **{xp_needed} XP** to Level {current_level + 1}"
         
@@ -429,16 +478,69 @@ class QuizView(discord.ui.View):
         
         await interaction.response.edit_message(embed=embed, view=self)
         
-        # AUTO CONTINUE IF CORRECT
+        # AUTO CONTINUE IF CORRECT (as a fresh task, not nested in this callback)
         if is_correct and not self.is_multiplayer:
-            await asyncio.sleep(2)
-            await self.cog.send_question(
-                self.interaction, 
-                self.mode, 
-                self.language, 
-                self.difficulty,
-                is_update=True
-            )
+            next_question = (self.interaction, self.mode, self.language, self.difficulty, True)
+            if scheduler.has_room():
+                scheduler.schedule(NEXT_QUESTION_DELAY, self.cog.send_question, *next_question)
+            else:
+                await asyncio.sleep(NEXT_QUESTION_DELAY)
+                await self.cog.send_question(*next_question)
+
+class LeaderboardView(discord.ui.View):
+    """Leaderboard pages, paged with a (score, user_id) cursor instead of an offset"""
+
+    TITLES = {
+        "xp": "🏆 Top Players (by XP)",
+        "streak": "🏆 Top Players (by Streak)",
+        "server": "🏆 Top Players in this Server",
+        "week": "🏆 Top Players this Week",
+        "month": "🏆 Top Players this Month",
+    }
+
+    def __init__(self, cog, kind: str, board: str, language: Optional[str] = None):
+        # Stopped through the shared scheduler once sent, or by discord.py if it is full
+        super().__init__(timeout=None if scheduler.has_room() else LEADERBOARD_TIMEOUT)
+        self.deadline = None
+        self.cog = cog
+        self.kind = kind
+        self.board = board
+        self.page_size = Config.RANKING["page_size"]
+        self.title = self.TITLES.get(kind) or f"🏆 Top Players in {Config.SUPPORTED_LANGUAGES[language]['name']}"
+        self.cursor = None      # (score, user_id) of the last row shown
+        self.first_rank = 1
+
+    def _show(self, entries: list, has_next: bool, first_rank: int) -> discord.Embed:
+        self.first_rank = first_rank
+        self.cursor = (entries[-1]['score'], entries[-1]['user_id'])
+        self.next_page.disabled = not has_next
+        self.top.disabled = first_rank == 1
+        return self.cog.leaderboard_embed(self.title, self.kind, entries, first_rank)
+
+    def show_snapshot(self, snapshot) -> discord.Embed:
+        return self._show(snapshot.entries, snapshot.has_next, 1)
+
+    async def render_next(self) -> Optional[discord.Embed]:
+        """The page past the cursor, None if there is nothing there"""
+        rows = await self.cog.ranking.page(self.board, self.page_size + 1, self.cursor)
+        if not rows:
+            return None
+        entries = await self.cog.snapshots.entries(rows[:self.page_size])
+        return self._show(entries, len(rows) > self.page_size, self.first_rank + self.page_size)
+
+    @discord.ui.button(label="Top", emoji="⏫", style=discord.ButtonStyle.secondary)
+    async def top(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = self.show_snapshot(await self.cog.snapshots.get(self.board))
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = await self.render_next()
+        if embed is None:
+            button.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+        await interaction.response.edit_message(embed=embed, view=self)
 
 async def setup(bot):
     await bot.add_cog(Quiz(bot))
@@ -1,243 +1,329 @@
 # database.py - Database management for quiz system
 
 import aiosqlite
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional, List, Dict
 import os
+from cogs.quiz.quiz_data import LEVEL_REQUIREMENTS, STREAK_BONUS
 
 logger = logging.getLogger('TranslatorBot.Database')
 
+# calculate_level() as SQL over the new XP total, highest requirement first
+LEVEL_SQL = "CASE " + " ".join(
+    f"WHEN xp + :xp_gained >= {required} THEN {level}"
+    for level, required in sorted(LEVEL_REQUIREMENTS.items(), reverse=True)
+) + " ELSE 1 END"
+
 class QuizDatabase:
     def __init__(self, db_path: str = "quiz_data.db"):
         self.db_path = db_path
-        
+        self.conn: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+
+    async def connect(self):
+        """Open the long-lived connection every query shares, then create tables"""
+        self.conn = await aiosqlite.connect(self.db_path)
+        self.conn.row_factory = aiosqlite.Row
+        # WAL lets readers run alongside the writer; NORMAL sync is durable enough with WAL
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA busy_timeout=5000")
+        await self.conn.execute("PRAGMA temp_store=MEMORY")
+        await self.conn.execute("PRAGMA cache_size=-16000")  # ~16 MB page cache
+        await self.initialize()
+
+    async def close(self):
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+            logger.info("Quiz database closed")
+
+    @asynccontextmanager
+    async def _transaction(self):
+        """Serialize writers on the shared connection; one commit, or a rollback on error"""
+        async with self._write_lock:
+            try:
+                yield self.conn
+            except BaseException:
+                await self.conn.rollback()
+                raise
+            await self.conn.commit()
+
     async def initialize(self):
-        """Initialize database and create tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Users table - stores XP, level, streak
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT,
-                    xp INTEGER DEFAULT 0,
-                    level INTEGER DEFAULT 1,
-                    current_streak INTEGER DEFAULT 0,
-                    best_streak INTEGER DEFAULT 0,
-                    total_questions INTEGER DEFAULT 0,
-                    correct_answers INTEGER DEFAULT 0,
-                    wrong_answers INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_quiz TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Quiz history table
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS quiz_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    language TEXT,
-                    difficulty TEXT,
-                    question TEXT,
-                    correct_answer TEXT,
-                    user_answer TEXT,
-                    is_correct BOOLEAN,
-                    xp_gained INTEGER,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                )
-            ''')
-            
-            # Achievements table
+        """Create tables"""
+        db = self.conn
+
+        # Users table - stores XP, level, streak
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                xp INTEGER DEFAULT 0,
+                level INTEGER DEFAULT 1,
+                current_streak INTEGER DEFAULT 0,
+                best_streak INTEGER DEFAULT 0,
+                total_questions INTEGER DEFAULT 0,
+                correct_answers INTEGER DEFAULT 0,
+                wrong_answers INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_quiz TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Quiz history table
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS quiz_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                language TEXT,
+                difficulty TEXT,
+                question TEXT,
+                correct_answer TEXT,
+                user_answer TEXT,
+                is_correct BOOLEAN,
+                xp_gained INTEGER,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )
+        ''')
+
+        # Achievements table
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS achievements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                achievement_name TEXT,
+                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )
+        ''')
+
+        # One row per (user, achievement); drop duplicates left by older versions first
+        async with db.execute('''
+            SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_achievements_user_name'
+        ''') as cursor:
+            has_unique_index = await cursor.fetchone() is not None
+        if not has_unique_index:
             await db.execute('''
-                CREATE TABLE IF NOT EXISTS achievements (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    achievement_name TEXT,
-                    unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
+                DELETE FROM achievements WHERE id NOT IN (
+                    SELECT MIN(id) FROM achievements GROUP BY user_id, achievement_name
                 )
             ''')
-            
-            await db.commit()
-            logger.info("Database initialized successfully")
-    
+            await db.execute(
+                'CREATE UNIQUE INDEX idx_achievements_user_name ON achievements(user_id, achievement_name)'
+            )
+
+        # Leaderboard scores per board ("xp", "streak", "xp:guild:<id>", "xp:week:<year>-W<week>", ...)
+        async with db.execute('''
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scores'
+        ''') as cursor:
+            has_scores = await cursor.fetchone() is not None
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS scores (
+                board TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                PRIMARY KEY (board, user_id)
+            ) WITHOUT ROWID
+        ''')
+        await db.execute('CREATE INDEX IF NOT EXISTS idx_scores_rank ON scores(board, score, user_id)')
+        if not has_scores:
+            # All-time boards start from what users already have
+            await db.execute("INSERT INTO scores (board, user_id, score) SELECT 'xp', user_id, xp FROM users")
+            await db.execute("INSERT INTO scores (board, user_id, score) SELECT 'streak', user_id, best_streak FROM users")
+
+        await db.commit()
+        logger.info("Database initialized successfully")
+
     async def get_user(self, user_id: int, username: str = None) -> Dict:
         """Get user data, create if doesn't exist"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
-            async with db.execute(
-                'SELECT * FROM users WHERE user_id = ?', (user_id,)
-            ) as cursor:
-                user = await cursor.fetchone()
-            
-            if user is None:
-                # Create new user
+        async with self.conn.execute(
+            'SELECT * FROM users WHERE user_id = ?', (user_id,)
+        ) as cursor:
+            user = await cursor.fetchone()
+
+        if user is None:
+            # Create new user
+            async with self._transaction() as db:
                 await db.execute('''
-                    INSERT INTO users (user_id, username, xp, level, current_streak, best_streak)
+                    INSERT OR IGNORE INTO users (user_id, username, xp, level, current_streak, best_streak)
                     VALUES (?, ?, 0, 1, 0, 0)
                 ''', (user_id, username or "Unknown"))
-                await db.commit()
-                
-                # Fetch the newly created user
-                async with db.execute(
-                    'SELECT * FROM users WHERE user_id = ?', (user_id,)
-                ) as cursor:
-                    user = await cursor.fetchone()
-            
-            return dict(user) if user else None
-    
-    async def update_user_stats(self, user_id: int, xp_gained: int, is_correct: bool):
-        """Update user statistics after quiz"""
-        async with aiosqlite.connect(self.db_path) as db:
-            user = await self.get_user(user_id)
-            
-            new_xp = user['xp'] + xp_gained
-            new_streak = user['current_streak'] + 1 if is_correct else 0
-            new_best_streak = max(user['best_streak'], new_streak)
-            
-            # Calculate new level
-            from cogs.quiz.quiz_data import calculate_level
-            new_level = calculate_level(new_xp)
-            
-            await db.execute('''
-                UPDATE users 
-                SET xp = ?,
-                    level = ?,
-                    current_streak = ?,
-                    best_streak = ?,
+
+            # Fetch the newly created user
+            async with self.conn.execute(
+                'SELECT * FROM users WHERE user_id = ?', (user_id,)
+            ) as cursor:
+                user = await cursor.fetchone()
+
+        return dict(user) if user else None
+
+    async def record_answer(self, user_id: int, username: str, language: str, difficulty: str,
+                            question: str, correct_answer: str, user_answer: str,
+                            is_correct: bool, base_xp: int, boards: List[str] = ()) -> Dict:
+        """Apply one answer (XP, streak, counters and history) in a single transaction
+
+        Counters are updated with in-SQL arithmetic under the write lock, so
+        concurrent answers from the same user cannot overwrite each other.
+        XP is also added to the "xp" board and every board in `boards`, and
+        the best streak to "streak". Returns the new stats plus what changed,
+        with the new leaderboard scores under 'scores'.
+        """
+        async with self._transaction() as db:
+            await db.execute(
+                'INSERT OR IGNORE INTO users (user_id, username) VALUES (?, ?)', (user_id, username or "Unknown")
+            )
+            async with db.execute(
+                'SELECT current_streak, level FROM users WHERE user_id = ?', (user_id,)
+            ) as cursor:
+                old_streak, old_level = await cursor.fetchone()
+
+            streak_xp = 0
+            if is_correct:
+                for streak_req, bonus in sorted(STREAK_BONUS.items()):
+                    if old_streak + 1 >= streak_req:
+                        streak_xp = bonus
+            xp_gained = base_xp + streak_xp if is_correct else 0
+
+            async with db.execute(f'''
+                UPDATE users
+                SET username = COALESCE(:username, username),
+                    xp = xp + :xp_gained,
+                    level = {LEVEL_SQL},
+                    current_streak = CASE WHEN :correct THEN current_streak + 1 ELSE 0 END,
+                    best_streak = MAX(best_streak, CASE WHEN :correct THEN current_streak + 1 ELSE 0 END),
                     total_questions = total_questions + 1,
-                    correct_answers = correct_answers + ?,
-                    wrong_answers = wrong_answers + ?,
+                    correct_answers = correct_answers + :correct,
+                    wrong_answers = wrong_answers + 1 - :correct,
                     last_quiz = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            ''', (new_xp, new_level, new_streak, new_best_streak, 
-                  1 if is_correct else 0, 0 if is_correct else 1, user_id))
-            
-            await db.commit()
-            
-            # Check for level up
-            level_up = new_level > user['level']
-            
-            return {
-                'new_xp': new_xp,
-                'new_level': new_level,
-                'new_streak': new_streak,
-                'level_up': level_up,
-                'old_level': user['level']
-            }
-    
-    async def add_quiz_history(self, user_id: int, language: str, difficulty: str, 
-                               question: str, correct_answer: str, user_answer: str, 
-                               is_correct: bool, xp_gained: int):
-        """Record quiz attempt"""
-        async with aiosqlite.connect(self.db_path) as db:
+                WHERE user_id = :user_id
+                RETURNING xp, level, current_streak, best_streak, total_questions, correct_answers, wrong_answers
+            ''', {"username": username, "xp_gained": xp_gained, "correct": int(is_correct), "user_id": user_id}) as cursor:
+                stats = dict(await cursor.fetchone())
+
             await db.execute('''
-                INSERT INTO quiz_history 
+                INSERT INTO quiz_history
                 (user_id, language, difficulty, question, correct_answer, user_answer, is_correct, xp_gained)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (user_id, language, difficulty, question, correct_answer, user_answer, is_correct, xp_gained))
-            await db.commit()
-    
-    async def get_leaderboard(self, limit: int = 10, by: str = "xp") -> List[Dict]:
-        """Get top players by XP or streak"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
-            order_column = "xp" if by == "xp" else "best_streak"
-            
-            async with db.execute(f'''
-                SELECT user_id, username, xp, level, best_streak, 
-                       correct_answers, total_questions
-                FROM users
-                ORDER BY {order_column} DESC
-                LIMIT ?
-            ''', (limit,)) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
-    
-    async def get_user_rank(self, user_id: int) -> int:
-        """Get user's rank on leaderboard"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute('''
-                SELECT COUNT(*) + 1 as rank
-                FROM users
-                WHERE xp > (SELECT xp FROM users WHERE user_id = ?)
-            ''', (user_id,)) as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else 0
-    
+
+            scores = {}
+            xp_boards = ["xp", *boards] if xp_gained else []
+            for board in xp_boards:
+                async with db.execute('''
+                    INSERT INTO scores (board, user_id, score) VALUES (?, ?, ?)
+                    ON CONFLICT (board, user_id) DO UPDATE SET score = score + excluded.score
+                    RETURNING score
+                ''', (board, user_id, xp_gained)) as cursor:
+                    scores[board] = (await cursor.fetchone())[0]
+            if is_correct:
+                async with db.execute('''
+                    INSERT INTO scores (board, user_id, score) VALUES ('streak', ?, ?)
+                    ON CONFLICT (board, user_id) DO UPDATE SET score = MAX(score, excluded.score)
+                    RETURNING score
+                ''', (user_id, stats['best_streak'])) as cursor:
+                    scores['streak'] = (await cursor.fetchone())[0]
+
+        return {
+            **stats,
+            'accuracy': round(stats['correct_answers'] / stats['total_questions'] * 100, 1),
+            'xp_gained': xp_gained,
+            'streak_xp': streak_xp,
+            'old_streak': old_streak,
+            'old_level': old_level,
+            'level_up': stats['level'] > old_level,
+            'scores': scores
+        }
+
+    async def get_users(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """Users by id, for rendering leaderboard rows"""
+        if not user_ids:
+            return {}
+        placeholders = ",".join("?" * len(user_ids))
+        async with self.conn.execute(
+            f'SELECT * FROM users WHERE user_id IN ({placeholders})', tuple(user_ids)
+        ) as cursor:
+            return {row['user_id']: dict(row) for row in await cursor.fetchall()}
+
+    async def update_usernames(self, usernames: Dict[int, str]):
+        """Store names seen on Discord, so leaderboards never need to look them up"""
+        if not usernames:
+            return
+        async with self._transaction() as db:
+            await db.executemany(
+                'UPDATE users SET username = ? WHERE user_id = ?',
+                [(username, user_id) for user_id, username in usernames.items()]
+            )
+
+    async def get_board(self, board: str) -> List[tuple]:
+        """Every (user_id, score) on a board, for rebuilding the Redis copy"""
+        async with self.conn.execute(
+            'SELECT user_id, score FROM scores WHERE board = ?', (board,)
+        ) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+    async def get_board_page(self, board: str, limit: int, after: Optional[tuple] = None) -> List[tuple]:
+        """Top (user_id, score) rows, continuing after the (score, user_id) cursor of the previous page"""
+        if after is None:
+            sql, params = 'WHERE board = ?', (board,)
+        else:
+            sql, params = 'WHERE board = ? AND (score, user_id) < (?, ?)', (board, *after)
+        async with self.conn.execute(f'''
+            SELECT user_id, score FROM scores {sql}
+            ORDER BY score DESC, user_id DESC
+            LIMIT ?
+        ''', (*params, limit)) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+    async def get_board_rank(self, board: str, user_id: int) -> Optional[int]:
+        """1-based position on a board, None if the user has no score there"""
+        async with self.conn.execute(
+            'SELECT score FROM scores WHERE board = ? AND user_id = ?', (board, user_id)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        async with self.conn.execute('''
+            SELECT COUNT(*) + 1 FROM scores
+            WHERE board = ? AND (score, user_id) > (?, ?)
+        ''', (board, row[0], user_id)) as cursor:
+            return (await cursor.fetchone())[0]
+
     async def get_user_stats(self, user_id: int) -> Dict:
         """Get detailed user statistics"""
         user = await self.get_user(user_id)
-        rank = await self.get_user_rank(user_id)
-        
+
         accuracy = 0
         if user['total_questions'] > 0:
             accuracy = (user['correct_answers'] / user['total_questions']) * 100
-        
+
         return {
             **user,
-            'rank': rank,
             'accuracy': round(accuracy, 1)
         }
-    
-    async def unlock_achievement(self, user_id: int, achievement_name: str) -> bool:
-        """Unlock achievement for user, returns True if newly unlocked"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Check if already unlocked
-            async with db.execute('''
-                SELECT id FROM achievements 
-                WHERE user_id = ? AND achievement_name = ?
-            ''', (user_id, achievement_name)) as cursor:
-                existing = await cursor.fetchone()
-            
-            if existing:
-                return False  # Already unlocked
-            
-            # Unlock achievement
-            await db.execute('''
-                INSERT INTO achievements (user_id, achievement_name)
-                VALUES (?, ?)
-            ''', (user_id, achievement_name))
-            await db.commit()
-            return True
-    
+
+    async def add_achievements(self, user_id: int, achievement_names: List[str]) -> List[str]:
+        """Persist unlocks, returns the names that were not already unlocked"""
+        unlocked = []
+        async with self._transaction() as db:
+            for name in achievement_names:
+                cursor = await db.execute('''
+                    INSERT OR IGNORE INTO achievements (user_id, achievement_name)
+                    VALUES (?, ?)
+                ''', (user_id, name))
+                if cursor.rowcount:
+                    unlocked.append(name)
+        return unlocked
+
     async def get_user_achievements(self, user_id: int) -> List[str]:
         """Get list of user's achievements"""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute('''
-                SELECT achievement_name FROM achievements
-                WHERE user_id = ?
-                ORDER BY unlocked_at DESC
-            ''', (user_id,)) as cursor:
-                rows = await cursor.fetchall()
-                return [row[0] for row in rows]
-    
-    async def check_achievements(self, user_id: int, stats: Dict) -> List[str]:
-        """Check and unlock achievements based on stats"""
-        new_achievements = []
-        
-        achievements_to_check = [
-            ("first_quiz", stats['total_questions'] >= 1, "🎯 First Steps"),
-            ("10_quizzes", stats['total_questions'] >= 10, "📚 Dedicated Learner"),
-            ("50_quizzes", stats['total_questions'] >= 50, "🎓 Quiz Master"),
-            ("100_quizzes", stats['total_questions'] >= 100, "🏆 Century Club"),
-            ("streak_5", stats['best_streak'] >= 5, "🔥 Hot Streak"),
-            ("streak_10", stats['best_streak'] >= 10, "⚡ Lightning Round"),
-            ("streak_20", stats['best_streak'] >= 20, "💫 Unstoppable"),
-            ("level_5", stats['level'] >= 5, "⭐ Rising Star"),
-            ("level_10", stats['level'] >= 10, "🌟 Expert"),
-            ("level_20", stats['level'] >= 20, "👑 Legend"),
-            ("perfect_10", stats['correct_answers'] >= 10 and stats['accuracy'] == 100, "💯 Perfectionist"),
-        ]
-        
-        for achievement_id, condition, achievement_name in achievements_to_check:
-            if condition:
-                unlocked = await self.unlock_achievement(user_id, achievement_name)
-                if unlocked:
-                    new_achievements.append(achievement_name)
-        
-        return new_achievements
\ No newline at end of file
+        async with self.conn.execute('''
+            SELECT achievement_name FROM achievements
+            WHERE user_id = ?
+            ORDER BY unlocked_at DESC
+        ''', (user_id,)) as cursor:
+            rows = await cursor.fetchall()
+            return [row[0] for row in rows]
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from utils.metrics import metrics
+from cogs.quiz.database import QuizDatabase
+from cogs.quiz.ranking import Ranking
+
+logger = logging.getLogger('TranslatorBot')
+
+@dataclass
+class Snapshot:
+    entries: List[Dict]         # user_id, score, username, level, in rank order
+    has_next: bool
+    built_at: float = field(default_factory=time.monotonic)
+    viewed_at: float = field(default_factory=time.monotonic)
+    dirty: bool = False
+
+class LeaderboardSnapshots:
+    """First leaderboard page per board, rendered ahead of time and refreshed in the background
+
+    A board is refreshed on the next tick after a score reaches its top
+    page, and at least every snapshot_max_age seconds otherwise. Names come
+    from the gateway cache or users.username, never from the REST API.
+    """
+
+    def __init__(self, bot, db: QuizDatabase, ranking: Ranking):
+        settings = Config.RANKING
+        self.bot = bot
+        self.db = db
+        self.ranking = ranking
+        self.page_size = settings["page_size"]
+        self.interval = settings["snapshot_interval"]
+        self.max_age = settings["snapshot_max_age"]
+        self.idle = settings["snapshot_idle"]
+        self.snapshots: Dict[str, Snapshot] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in self._refreshing.values():
+            task.cancel()
+
+    def peek(self, board: str) -> Optional[Snapshot]:
+        """The current snapshot, without touching the database"""
+        snapshot = self.snapshots.get(board)
+        if snapshot:
+            snapshot.viewed_at = time.monotonic()
+            metrics.incr("leaderboard.snapshot.hit")
+        return snapshot
+
+    async def get(self, board: str) -> Snapshot:
+        return self.peek(board) or await self.refresh(board)
+
+    def scores_changed(self, scores: Dict[str, int]):
+        """Mark boards whose top page a new score may have changed"""
+        for board, score in scores.items():
+            snapshot = self.snapshots.get(board)
+            if snapshot and not snapshot.dirty and (
+                len(snapshot.entries) < self.page_size or score >= snapshot.entries[-1]['score']
+            ):
+                snapshot.dirty = True
+
+    async def refresh(self, board: str) -> Snapshot:
+        """Rebuild one board, sharing the rebuild with concurrent callers"""
+        task = self._refreshing.get(board)
+        if task is None:
+            task = self._refreshing[board] = asyncio.create_task(self._build(board))
+            task.add_done_callback(lambda _: self._refreshing.pop(board, None))
+        return await asyncio.shield(task)
+
+    async def _build(self, board: str) -> Snapshot:
+        metrics.incr("leaderboard.snapshot.build")
+        rows = await self.ranking.page(board, self.page_size + 1)
+        previous = self.snapshots.get(board)
+        snapshot = Snapshot(await self.entries(rows[:self.page_size]), len(rows) > self.page_size)
+        if previous:
+            snapshot.viewed_at = previous.viewed_at
+        self.snapshots[board] = snapshot
+        return snapshot
+
+    async def entries(self, rows: List[Tuple[int, int]]) -> List[Dict]:
+        """(user_id, score) rows with names and levels, in one query"""
+        users = await self.db.get_users([user_id for user_id, _ in rows])
+        renamed = {}
+        entries = []
+        for user_id, score in rows:
+            player = users.get(user_id, {})
+            username = player.get('username')
+            user = self.bot.get_user(user_id)
+            if user and user.name != username:
+                username = renamed[user_id] = user.name
+            entries.append({
+                'user_id': user_id,
+                'score': score,
+                'username': username or "Unknown",
+                'level': player.get('level', 1),
+            })
+        if renamed:
+            await self.db.update_usernames(renamed)
+        return entries
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            for board, snapshot in list(self.snapshots.items()):
+                if now - snapshot.viewed_at > self.idle:
+                    del self.snapshots[board]
+                elif snapshot.dirty or now - snapshot.built_at >= self.max_age:
+                    try:
+                        await self.refresh(board)
+                    except Exception as e:
+                        logger.error(f"Leaderboard refresh error ({board}): {e}")
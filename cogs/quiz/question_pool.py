@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from config import Config
+from utils.metrics import metrics
+from utils.translator import translator
+from cogs.quiz.quiz_data import get_random_word, get_all_words_except
+from cogs.quiz.vocabulary import Vocabulary
+
+logger = logging.getLogger('TranslatorBot')
+
+@dataclass
+class Question:
+    word: str
+    category: str
+    options: List[str]
+    correct_index: int
+
+    @property
+    def correct_translation(self) -> str:
+        return self.options[self.correct_index]
+
+class QuestionPool:
+    """Ready-made questions per (language, difficulty), refilled in the background"""
+
+    def __init__(self, vocabulary: Vocabulary):
+        self.vocabulary = vocabulary
+        settings = Config.QUIZ_POOL
+        self.size = settings["size"]
+        self.concurrency = settings["concurrency"]
+        self._queues: Dict[Tuple[str, str], asyncio.Queue] = {}
+        self._refills: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def start(self):
+        if Config.QUIZ_POOL["prefill"]:
+            for language in Config.SUPPORTED_LANGUAGES:
+                for difficulty in ("easy", "medium", "hard"):
+                    self._refill_soon((language, difficulty))
+
+    def close(self):
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
+
+    async def get(self, language: str, difficulty: str) -> Question:
+        """Pop a ready question; only a cold pool makes the caller wait for translations"""
+        key = (language, difficulty)
+        queue = self._queue(key)
+        self._refill_soon(key)
+        if not queue.empty():
+            metrics.incr("quiz.pool.hit")
+            return queue.get_nowait()
+        metrics.incr("quiz.pool.miss")
+        return await self.build(language, difficulty)
+
+    async def build(self, language: str, difficulty: str) -> Question:
+        word, category = get_random_word(difficulty)
+        words = [word] + get_all_words_except(difficulty, word, 3)
+        # Precompiled vocabulary first; anything missing is translated concurrently through the cache
+        options = [self.vocabulary.get(w, language) for w in words]
+        missing = [i for i, translation in enumerate(options) if translation is None]
+        if missing:
+            metrics.incr("quiz.vocabulary.miss", len(missing))
+            results = await asyncio.gather(*(
+                translator.translate_cached(words[i], language, source='en') for i in missing
+            ))
+            for i, (translation, _) in zip(missing, results):
+                options[i] = translation
+
+        correct_translation = options[0]
+        random.shuffle(options)
+        return Question(word, category, options, options.index(correct_translation))
+
+    def _queue(self, key: Tuple[str, str]) -> asyncio.Queue:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue(maxsize=self.size)
+        return queue
+
+    def _refill_soon(self, key: Tuple[str, str]):
+        task = self._refills.get(key)
+        if task is None or task.done():
+            self._refills[key] = asyncio.create_task(self._refill(key))
+
+    async def _refill(self, key: Tuple[str, str]):
+        queue = self._queue(key)
+        while not queue.full():
+            missing = min(self.concurrency, queue.maxsize - queue.qsize())
+            results = await asyncio.gather(*(self.build(*key) for _ in range(missing)), return_exceptions=True)
+            failed = False
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Quiz pool refill error {key}: {result}")
+                    failed = True
+                elif not queue.full():
+                    queue.put_nowait(result)
+            if failed:
+                # Keep what was built, try again on the next pop rather than hammering a failing backend
+                return
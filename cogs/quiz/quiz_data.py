@@ -148,6 +148,20 @@ STREAK_BONUS = {
     20: 100 # 20 in a row: +100 bonus
 }
 
+# Achievements: (name, stat, threshold), unlocked once the stat reaches the threshold
+ACHIEVEMENTS = [
+    ("🎯 First Steps", "total_questions", 1),
+    ("📚 Dedicated Learner", "total_questions", 10),
+    ("🎓 Quiz Master", "total_questions", 50),
+    ("🏆 Century Club", "total_questions", 100),
+    ("🔥 Hot Streak", "best_streak", 5),
+    ("⚡ Lightning Round", "best_streak", 10),
+    ("💫 Unstoppable", "best_streak", 20),
+    ("⭐ Rising Star", "level", 5),
+    ("🌟 Expert", "level", 10),
+    ("👑 Legend", "level", 20),
+]
+
 # Level requirements (XP needed for each level)
 LEVEL_REQUIREMENTS = {
     1: 0,
@@ -0,0 +1,154 @@
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from utils.cache import cache
+from utils.metrics import metrics
+from cogs.quiz.database import QuizDatabase
+
+logger = logging.getLogger('TranslatorBot')
+
+class Ranking:
+    """Leaderboards as Redis sorted sets (O(log n) rank and top-N), with the SQLite scores table as fallback
+
+    SQLite is the source of truth: record_answer returns each board's new
+    score, which is mirrored here with ZADD GT, so replays and reordering
+    are harmless. Every read and write checks the key exists in the same
+    round trip, and a board Redis lost is rebuilt from SQLite.
+    """
+
+    def __init__(self, db: QuizDatabase):
+        self.db = db
+
+    @staticmethod
+    def boards_for(guild_id: Optional[int], language: str, now: datetime = None) -> List[str]:
+        """XP boards an answer counts towards, besides the all-time "xp" board"""
+        now = now or datetime.now(timezone.utc)
+        year, week, _ = now.isocalendar()
+        boards = [f"xp:lang:{language}", f"xp:week:{year}-W{week:02d}", f"xp:month:{now:%Y-%m}"]
+        if guild_id:
+            boards.append(f"xp:guild:{guild_id}")
+        return boards
+
+    @staticmethod
+    def current_board(kind: str, guild_id: Optional[int] = None, language: Optional[str] = None) -> str:
+        """Board name for a /leaderboard choice"""
+        now = datetime.now(timezone.utc)
+        if kind == "week":
+            year, week, _ = now.isocalendar()
+            return f"xp:week:{year}-W{week:02d}"
+        if kind == "month":
+            return f"xp:month:{now:%Y-%m}"
+        if kind == "server":
+            return f"xp:guild:{guild_id}"
+        if kind == "language":
+            return f"xp:lang:{language}"
+        return kind  # "xp" or "streak"
+
+    def _key(self, board: str) -> str:
+        return f"leaderboard:{board}"
+
+    @staticmethod
+    def _member(user_id: int) -> str:
+        # Zero-padded so Redis breaks score ties like SQLite does (user_id DESC)
+        return f"{user_id:020d}"
+
+    def _ttl(self, board: str) -> Optional[int]:
+        parts = board.split(":")
+        return Config.RANKING["period_ttl"].get(parts[1]) if len(parts) > 1 else None
+
+    async def _rebuild(self, board: str):
+        """Reload a board Redis lost (restart, eviction, expiry) from SQLite"""
+        key = self._key(board)
+        rows = await self.db.get_board(board)
+        chunk = Config.RANKING["rebuild_chunk"]
+        async with cache.redis.pipeline(transaction=False) as pipe:
+            for start in range(0, len(rows), chunk):
+                pipe.zadd(key, {self._member(user_id): score for user_id, score in rows[start:start + chunk]}, gt=True)
+            ttl = self._ttl(board)
+            if ttl and rows:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+        metrics.incr("ranking.rebuild")
+        logger.info(f"Rebuilt leaderboard {board} in Redis ({len(rows)} entries)")
+
+    async def _read(self, board: str, commands: Callable) -> list:
+        """Run commands(pipe, key) on a board, rebuilding it first if the key is gone"""
+        key = self._key(board)
+        for rebuilt in (False, True):
+            async with cache.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                commands(pipe, key)
+                exists, *results = await pipe.execute()
+            if exists or rebuilt:
+                return results
+            await self._rebuild(board)
+
+    async def publish(self, user_id: int, scores: Dict[str, int]):
+        """Mirror new scores from record_answer into Redis"""
+        if not cache.connected or not scores:
+            return
+        checks = {}
+        try:
+            async with cache.redis.pipeline(transaction=False) as pipe:
+                for board in scores:
+                    key = self._key(board)
+                    checks[board] = len(pipe)
+                    pipe.exists(key)
+                    pipe.zadd(key, {self._member(user_id): scores[board]}, gt=True)
+                    ttl = self._ttl(board)
+                    if ttl:
+                        pipe.expire(key, ttl)
+                results = await pipe.execute()
+            # EXISTS ran before the write: a missing key now only holds this user, so reload the rest
+            for board, index in checks.items():
+                if not results[index]:
+                    await self._rebuild(board)
+        except Exception as e:
+            logger.error(f"Redis leaderboard error: {e}")
+
+    async def rank(self, board: str, user_id: int) -> Optional[int]:
+        """1-based rank on a board, None if the user is not on it"""
+        if cache.connected:
+            try:
+                rank, = await self._read(board, lambda pipe, key: pipe.zrevrank(key, self._member(user_id)))
+                return None if rank is None else rank + 1
+            except Exception as e:
+                logger.error(f"Redis leaderboard error: {e}")
+        metrics.incr("ranking.fallback")
+        return await self.db.get_board_rank(board, user_id)
+
+    async def page(self, board: str, limit: int, after: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+        """(user_id, score) rows from the top, or after the (score, user_id) of the previous page's last row"""
+        if cache.connected:
+            try:
+                return await self._page_redis(board, limit, after)
+            except Exception as e:
+                logger.error(f"Redis leaderboard error: {e}")
+        metrics.incr("ranking.fallback")
+        return await self.db.get_board_page(board, limit, after)
+
+    async def _page_redis(self, board: str, limit: int, after: Optional[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        if after is None:
+            rows, = await self._read(board, lambda pipe, key: pipe.zrevrange(key, 0, limit - 1, withscores=True))
+            return [(int(member), int(score)) for member, score in rows]
+
+        # Keyset: members tied with the cursor's score that sort after it, then lower scores,
+        # so users climbing between clicks cannot shift rows back onto the next page
+        score, user_id = after
+        cursor = self._member(user_id)
+        current, rank, higher, lower = await self._read(board, lambda pipe, key: (
+            pipe.zscore(key, cursor),
+            pipe.zrevrank(key, cursor),
+            pipe.zcount(key, f"({score}", "+inf"),
+            pipe.zrevrangebyscore(key, f"({score}", "-inf", start=0, num=limit, withscores=True),
+        ))
+        key = self._key(board)
+        if current is not None and int(current) == score:
+            # Ties are ordered by member, so the cursor's own position marks where the rest start
+            ties = await cache.redis.zrevrangebyscore(key, score, score, start=rank - higher + 1, num=limit, withscores=True)
+        else:
+            # The cursor's user moved since the last page: scan that score's ties instead
+            ties = await cache.redis.zrevrangebyscore(key, score, score, withscores=True)
+        rows = [(member, value) for member, value in ties if member < cursor] + lower
+        return [(int(member), int(value)) for member, value in rows[:limit]]
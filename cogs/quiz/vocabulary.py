@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+import aiosqlite
+from config import Config
+from utils.translator import translator
+from cogs.quiz.quiz_data import QUIZ_DATA
+
+logger = logging.getLogger('TranslatorBot')
+
+def all_words() -> List[str]:
+    """Every distinct word in QUIZ_DATA"""
+    return sorted({word for categories in QUIZ_DATA.values() for words in categories.values() for word in words})
+
+class Vocabulary:
+    """QUIZ_DATA translated ahead of time into every supported language, kept in SQLite"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.QUIZ_VOCABULARY["path"]
+        self.batch_size = Config.QUIZ_VOCABULARY["batch_size"]
+        self.translations: Dict[Tuple[str, str], str] = {}  # (word, language): translation
+
+    def __len__(self) -> int:
+        return len(self.translations)
+
+    def get(self, word: str, language: str) -> Optional[str]:
+        return self.translations.get((word, language))
+
+    async def _connect(self) -> aiosqlite.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = await aiosqlite.connect(self.path)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS vocabulary (
+                word TEXT NOT NULL,
+                language TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                PRIMARY KEY (word, language)
+            ) WITHOUT ROWID
+        """)
+        return db
+
+    async def load(self):
+        if not os.path.exists(self.path):
+            logger.warning(f"Quiz vocabulary not built yet ({self.path}), quizzes will translate on demand")
+            return
+        async with aiosqlite.connect(self.path) as db:
+            async with db.execute("SELECT word, language, translation FROM vocabulary") as cursor:
+                self.translations = {(word, language): translation async for word, language, translation in cursor}
+        logger.info(f"Loaded {len(self.translations)} quiz vocabulary translations")
+
+    async def build(self, languages: List[str] = None, full: bool = False) -> int:
+        """Translate the (word, language) pairs the artifact is missing, returns how many were added
+
+        Words no longer in QUIZ_DATA are dropped; full=True retranslates the given languages.
+        """
+        languages = languages or list(Config.SUPPORTED_LANGUAGES)
+        words = all_words()
+        db = await self._connect()
+        try:
+            if full:
+                # Only the languages being rebuilt; the others stay usable
+                await db.executemany("DELETE FROM vocabulary WHERE language = ?", [(language,) for language in languages])
+            else:
+                current = set(words)
+                await db.executemany("DELETE FROM vocabulary WHERE word = ?", [
+                    (word,) for (word,) in await db.execute_fetchall("SELECT DISTINCT word FROM vocabulary")
+                    if word not in current
+                ])
+            await db.commit()
+            existing = set(await db.execute_fetchall("SELECT word, language FROM vocabulary"))
+
+            added = 0
+            for language in languages:
+                missing = [word for word in words if (word, language) not in existing]
+                for start in range(0, len(missing), self.batch_size):
+                    batch = missing[start:start + self.batch_size]
+                    rows = await self._translate_batch(batch, language)
+                    await db.executemany(
+                        "INSERT OR REPLACE INTO vocabulary (word, language, translation) VALUES (?, ?, ?)", rows
+                    )
+                    await db.commit()
+                    added += len(rows)
+                if missing:
+                    logger.info(f"Quiz vocabulary: {len(missing)} words translated to {language}")
+        finally:
+            await db.close()
+
+        await self.load()
+        return added
+
+    async def _translate_batch(self, words: List[str], language: str) -> List[Tuple[str, str, str]]:
+        if language == "en":
+            return [(word, language, word) for word in words]
+        # Issued together so the translator's micro-batcher sends them as a few backend calls
+        results = await asyncio.gather(*(
+            translator.translate_cached(word, language, source='en') for word in words
+        ), return_exceptions=True)
+
+        rows = []
+        for word, result in zip(words, results):
+            if isinstance(result, Exception):
+                logger.error(f"Quiz vocabulary: '{word}' to {language} failed: {result}")
+                continue
+            rows.append((word, language, result[0]))
+        return rows
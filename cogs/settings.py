@@ -5,6 +5,7 @@ from discord.ext import commands
 import logging
 from config import Config
 from utils.cache import cache
+from utils.rate_limit import rate_limit
 
 logger = logging.getLogger('TranslatorBot')
 
@@ -13,6 +14,7 @@ class Settings(commands.Cog):
         self.bot = bot
 
     @app_commands.command(name="settings", description="Configure your preferences")
+    @rate_limit("default")
     async def settings(self, interaction: discord.Interaction):
         # Fetch current settings (Cache -> DB)
         user_settings = await cache.get_user_settings(interaction.user.id)
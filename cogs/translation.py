@@ -2,19 +2,24 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from deep_translator import GoogleTranslator
-from langdetect import detect
 import logging
 from typing import Optional
 from utils.cache import cache
-from utils.embeds import create_translation_embed
-from gtts import gTTS
+from utils.translator import translator
+from utils.detection import detector
+from utils.admission import AdmissionRejected
+from utils.rate_limit import RateLimited, rate_limit, rate_limit_predicate, rate_limiter
+from utils.embeds import create_translation_embed, create_multi_translation_embeds
+from utils.tts import tts
 import io
 import os
 from config import Config
 
 logger = logging.getLogger('TranslatorBot')
 
+BUSY_MESSAGE = "⏳ The translation service is busy right now. Please try again in a few seconds."
+EXPIRED_MESSAGE = "⌛ This translation has expired, please translate the message again."
+
 class Translation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -27,32 +32,42 @@ class Translation(commands.Cog):
             name="⚡ Quick Translate",
             callback=self.quick_translate
         )
+        self.ctx_menu_all = app_commands.ContextMenu(
+            name="🌍 Translate to All",
+            callback=self.translate_all_context
+        )
+        for menu in (self.ctx_menu_translate, self.ctx_menu_quick, self.ctx_menu_all):
+            menu.add_check(rate_limit_predicate("translate"))
         self.bot.tree.add_command(self.ctx_menu_translate)
         self.bot.tree.add_command(self.ctx_menu_quick)
+        self.bot.tree.add_command(self.ctx_menu_all)
+
+    async def cog_load(self):
+        # Registered once; every translation message's components route here by custom_id
+        self.bot.add_dynamic_items(LanguageSelect, ShareButton, ListenButton)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(LanguageSelect, ShareButton, ListenButton)
 
     async def _process_translation(self, interaction: discord.Interaction, text: str, target_lang: str):
         await interaction.response.defer(ephemeral=True)
         
-        # Detect language
-        try:
-            source_lang = detect(text)
-        except:
-            source_lang = "auto"
+        # Detect language (script short-circuit, cache, then off-loop langdetect)
+        source_lang = await detector.detect(text)
             
-        # Check cache
-        cache_hit = False
-        translated_text = await cache.get_translation(text, source_lang, target_lang)
-        
-        if not translated_text:
-            try:
-                translated_text = GoogleTranslator(source='auto', target=target_lang).translate(text)
-                await cache.set_translation(text, source_lang, target_lang, translated_text)
-            except Exception as e:
-                logger.error(f"Translation error: {e}")
-                await interaction.followup.send("❌ Failed to translate message.", ephemeral=True)
-                return
-        else:
-            cache_hit = True
+        # Cache, then a shared backend call
+        try:
+            translated_text, cache_hit = await translator.translate_cached(
+                text, target_lang, detected=source_lang
+            )
+        except AdmissionRejected as e:
+            logger.warning(f"Translation rejected: {e}")
+            await interaction.followup.send(BUSY_MESSAGE, ephemeral=True)
+            return
+        except Exception as e:
+            logger.error(f"Translation error: {e}")
+            await interaction.followup.send("❌ Failed to translate message.", ephemeral=True)
+            return
 
         embed = create_translation_embed(
             original_text=text,
@@ -62,17 +77,51 @@ class Translation(commands.Cog):
             cache_hit=cache_hit
         )
         
-        # View with buttons
-        view = TranslationView(text, translated_text, target_lang)
+        # Buttons carry only the cache key, the text itself stays in the cache
+        key = await cache.set_source_text(text)
+        view = stateless_view(ShareButton(key, target_lang), ListenButton(key, target_lang))
         await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
+    async def _process_multi_translation(self, interaction: discord.Interaction, text: str):
+        await interaction.response.defer(ephemeral=True)
+
+        # Detect once, then every supported language except the source
+        source_lang = await detector.detect(text)
+        targets = [code for code in Config.SUPPORTED_LANGUAGES if code != source_lang]
+        results = await translator.translate_to_many(text, targets, detected=source_lang)
+
+        translations = {}
+        for target, result in results.items():
+            if isinstance(result, Exception):
+                logger.error(f"Translation error ({target}): {result}")
+            else:
+                translations[target] = result
+
+        if not translations:
+            busy = all(isinstance(result, AdmissionRejected) for result in results.values())
+            await interaction.followup.send(BUSY_MESSAGE if busy else "❌ Failed to translate message.", ephemeral=True)
+            return
+
+        embeds = create_multi_translation_embeds(text, source_lang, translations)
+        if len(embeds) > 1:
+            await interaction.followup.send(embed=embeds[0], view=PaginatedEmbedView(embeds), ephemeral=True)
+        else:
+            await interaction.followup.send(embed=embeds[0], ephemeral=True)
+
+    async def translate_all_context(self, interaction: discord.Interaction, message: discord.Message):
+        if not message.content:
+            await interaction.response.send_message("❌ No text content to translate.", ephemeral=True)
+            return
+        await self._process_multi_translation(interaction, message.content)
+
     async def context_translate(self, interaction: discord.Interaction, message: discord.Message):
         if not message.content:
             await interaction.response.send_message("❌ No text content to translate.", ephemeral=True)
             return
             
         # Show language selection first
-        view = LanguageSelectView(message.content, self)
+        key = await cache.set_source_text(message.content)
+        view = stateless_view(LanguageSelect(key))
         await interaction.response.send_message("Select target language:", view=view, ephemeral=True)
 
     async def quick_translate(self, interaction: discord.Interaction, message: discord.Message):
@@ -94,6 +143,7 @@ class Translation(commands.Cog):
         await self._process_translation(interaction, message.content, target_lang)
 
     @app_commands.command(name="translate", description="Translate text")
+    @rate_limit("translate")
     @app_commands.describe(text="Text to translate", target="Target language code (en, ru, ko, etc)")
     async def translate_cmd(self, interaction: discord.Interaction, text: str, target: Optional[str] = None):
         if not target:
@@ -105,55 +155,147 @@ class Translation(commands.Cog):
              
         await self._process_translation(interaction, text, target)
 
+    @app_commands.command(name="translate_all", description="Translate text into every supported language")
+    @rate_limit("translate")
+    @app_commands.describe(text="Text to translate")
+    async def translate_all_cmd(self, interaction: discord.Interaction, text: str):
+        await self._process_multi_translation(interaction, text)
 
-class LanguageSelectView(discord.ui.View):
-    def __init__(self, text: str, cog: Translation):
-        super().__init__()
-        self.text = text
-        self.cog = cog
-        
-        # Add Select
-        select = discord.ui.Select(placeholder="Select Language...", min_values=1, max_values=1)
-        
+
+class PaginatedEmbedView(discord.ui.View):
+    def __init__(self, embeds: list):
+        super().__init__(timeout=300)
+        self.embeds = embeds
+        self.page = 0
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page == len(self.embeds) - 1
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(len(self.embeds) - 1, self.page + 1)
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+
+
+def stateless_view(*items: discord.ui.Item) -> discord.ui.View:
+    """View that is sent but never stored
+
+    Stopping it before sending keeps discord.py from holding it in the view
+    store; clicks are routed by the dynamic item templates registered in
+    cog_load, so the buttons also keep working after a restart.
+    """
+    view = discord.ui.View(timeout=None)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
+
+async def load_translation(interaction: discord.Interaction, key: str, lang_code: str) -> Optional[str]:
+    """Re-read the text behind a button from the cache, translating again only if it was evicted"""
+    text = await cache.get_source_text(key)
+    if text is None:
+        await interaction.followup.send(EXPIRED_MESSAGE, ephemeral=True)
+        return None
+    try:
+        translated, _ = await translator.translate_cached(text, lang_code, detected=await detector.detect(text))
+    except AdmissionRejected:
+        await interaction.followup.send(BUSY_MESSAGE, ephemeral=True)
+        return None
+    except Exception as e:
+        logger.error(f"Translation error: {e}")
+        await interaction.followup.send("❌ Failed to translate message.", ephemeral=True)
+        return None
+    return translated
+
+class LanguageSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"translation:select:(?P<key>[0-9a-f]{32})"):
+    def __init__(self, key: str):
+        select = discord.ui.Select(
+            placeholder="Select Language...", min_values=1, max_values=1,
+            custom_id=f"translation:select:{key}"
+        )
         for code, info in Config.SUPPORTED_LANGUAGES.items():
             select.add_option(label=info["name"], value=code, emoji=info["flag"])
-            
-        select.callback = self.select_callback
-        self.add_item(select)
-
-    async def select_callback(self, interaction: discord.Interaction):
-        target = interaction.data["values"][0]
-        await self.cog._process_translation(interaction, self.text, target)
-
-class TranslationView(discord.ui.View):
-    def __init__(self, original: str, translated: str, lang_code: str):
-        super().__init__()
-        self.original = original
-        self.translated = translated
+        super().__init__(select)
+        self.key = key
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(match["key"])
+
+    async def callback(self, interaction: discord.Interaction):
+        text = await cache.get_source_text(self.key)
+        if text is None:
+            await interaction.response.send_message(EXPIRED_MESSAGE, ephemeral=True)
+            return
+        cog = interaction.client.get_cog("Translation")
+        await cog._process_translation(interaction, text, self.item.values[0])
+
+class ShareButton(discord.ui.DynamicItem[discord.ui.Button], template=r"translation:share:(?P<key>[0-9a-f]{32}):(?P<lang>[\w-]+)"):
+    def __init__(self, key: str, lang_code: str):
+        super().__init__(discord.ui.Button(
+            label="📢 Show to All", style=discord.ButtonStyle.secondary,
+            custom_id=f"translation:share:{key}:{lang_code}"
+        ))
+        self.key = key
         self.lang_code = lang_code
 
-    @discord.ui.button(label="📢 Show to All", style=discord.ButtonStyle.secondary)
-    async def share(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["key"], match["lang"])
+
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        translated = await load_translation(interaction, self.key, self.lang_code)
+        if translated is None:
+            return
         try:
-            await interaction.channel.send(f"**Translation ({self.lang_code}):**\n{self.translated}")
-            await interaction.response.send_message("Shared!", ephemeral=True)
+            await interaction.channel.send(f"**Translation ({self.lang_code}):**\n{translated}")
+            await interaction.followup.send("Shared!", ephemeral=True)
         except discord.Forbidden:
-            await interaction.response.send_message("❌ I don't have permission to send messages in this channel.", ephemeral=True)
+            await interaction.followup.send("❌ I don't have permission to send messages in this channel.", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(f"❌ Error sharing: {e}", ephemeral=True)
+            await interaction.followup.send(f"❌ Error sharing: {e}", ephemeral=True)
+
+class ListenButton(discord.ui.DynamicItem[discord.ui.Button], template=r"translation:listen:(?P<key>[0-9a-f]{32}):(?P<lang>[\w-]+)"):
+    def __init__(self, key: str, lang_code: str):
+        super().__init__(discord.ui.Button(
+            label="🔊 Listen", style=discord.ButtonStyle.secondary, emoji="🔈",
+            custom_id=f"translation:listen:{key}:{lang_code}"
+        ))
+        self.key = key
+        self.lang_code = lang_code
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["key"], match["lang"])
+
+    async def callback(self, interaction: discord.Interaction):
+        try:
+            await rate_limiter.check("pronounce", interaction.user.id)
+        except RateLimited as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
 
-    @discord.ui.button(label="🔊 Listen", style=discord.ButtonStyle.secondary, emoji="🔈")
-    async def listen(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True)
-        
+        translated = await load_translation(interaction, self.key, self.lang_code)
+        if translated is None:
+            return
+
         try:
-            tts = gTTS(text=self.translated, lang=self.lang_code)
-            fp = io.BytesIO()
-            tts.write_to_fp(fp)
-            fp.seek(0)
-            
+            fp = io.BytesIO(await tts.synthesize(translated, self.lang_code))
             file = discord.File(fp, filename=f"pronunciation_{self.lang_code}.mp3")
             await interaction.followup.send(file=file, ephemeral=True)
+        except AdmissionRejected:
+            await interaction.followup.send(BUSY_MESSAGE, ephemeral=True)
         except Exception as e:
             logger.error(f"TTS Error: {e}")
             await interaction.followup.send("❌ TTS not available for this language/text.", ephemeral=True)
@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Optional
 from config import Config
 from utils.database import Database
+from utils.rate_limit import rate_limit
 import random # For mock data if DB is empty
 
 logger = logging.getLogger('TranslatorBot')
@@ -33,6 +34,7 @@ class WordOfDay(commands.Cog):
         # ...
 
     @app_commands.command(name="word", description="Get the Word of the Day")
+    @rate_limit("word_of_day")
     @app_commands.describe(language="Language code", category="Category (common, slang, etc)")
     async def word(self, interaction: discord.Interaction, language: Optional[str] = None, category: Optional[str] = None):
         if not language:
@@ -59,6 +61,7 @@ class WordOfDay(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="word_subscribe", description="Subscribe to daily words in DM")
+    @rate_limit("default")
     async def subscribe(self, interaction: discord.Interaction):
         # Toggle subscription in DB
         await interaction.response.send_message("✅ Subscribed to Word of the Day!", ephemeral=True)
@@ -29,15 +29,178 @@ class Config:
         "session": 600,             # 10 minutes
         "tts": 2592000,             # 30 days
         "user_settings": 3600,      # 1 hour
+        "source_text": 604800,      # 7 days, lets buttons re-read what was translated
     }
     
+    # Translation backend
+    TRANSLATOR: Dict[str, Any] = {
+        # Fallback chain, tried in order: google, google_executor, local
+        "backends": os.getenv("TRANSLATOR_BACKENDS", "google").split(","),
+        "timeout": float(os.getenv("TRANSLATOR_TIMEOUT", "10")),  # seconds per backend call
+        "failure_threshold": 5,     # consecutive failures before a backend is skipped
+        "cooldown": 30,             # seconds before a skipped backend is retried
+    }
+
+    TRANSLATION_BACKENDS: Dict[str, Dict[str, Any]] = {
+        "google": {"pool_size": 32},            # keep-alive connections
+        "google_executor": {"workers": 8},
+        # Offline stand-in for load tests (use a scratch REDIS_DB, results get cached)
+        "local": {
+            "latency": float(os.getenv("LOCAL_BACKEND_LATENCY", "0.05")),
+            "jitter": 0.02,
+            "error_rate": float(os.getenv("LOCAL_BACKEND_ERROR_RATE", "0")),
+            "stall_rate": 0.0,
+            "stall_latency": 3.0,
+            "seed": 0,
+        },
+    }
+
+    # Cache key scheme
+    CACHE_KEYS: Dict[str, Any] = {
+        "version": 2,
+        # Translation keys only; bumped whenever canonicalize() changes (v3: line breaks kept)
+        "translation_version": 3,
+        # Also read pre-v2 keys until they expire (CACHE_TTL["translation"])
+        "legacy_read": os.getenv("CACHE_LEGACY_READ", "true").lower() == "true",
+    }
+
+    # In-process L1 cache in front of Redis
+    L1_CACHE: Dict[str, Any] = {
+        "max_bytes": int(os.getenv("L1_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        "max_entries": 100000,
+        # Settings can be changed by another process, keep them short-lived locally
+        "ttl_overrides": {"user_settings": 300},
+    }
+
+    # Admission control per backend (translation backends by name, plus "tts")
+    ADMISSION: Dict[str, Dict[str, Any]] = {
+        "default": {
+            "rate": 20,                 # requests per second (token bucket)
+            "burst": 40,
+            "min_concurrency": 2,       # AIMD bounds for in-flight requests
+            "max_concurrency": int(os.getenv("TRANSLATOR_CONCURRENCY", "16")),
+            "max_queue": 200,           # waiting callers before failing fast
+            "max_wait": 5.0,            # seconds a caller may wait for admission
+            "latency_target": 2.0,      # slower calls shrink the concurrency limit
+            "backoff_base": 0.5,        # seconds, doubled per consecutive 429
+            "backoff_max": 30.0,
+        },
+        "tts": {"rate": 5, "burst": 10, "max_concurrency": 4, "max_queue": 50, "latency_target": 5.0},
+        "local": {"rate": 10000, "burst": 10000, "max_concurrency": 256, "max_queue": 10000},
+    }
+
+    # Hedged requests on latency outliers
+    HEDGING: Dict[str, Any] = {
+        "enabled": os.getenv("TRANSLATION_HEDGING", "true").lower() == "true",
+        "percentile": 95,           # hedge once the primary is slower than its p95
+        "min_samples": 20,          # latency samples needed before using the percentile
+        "initial_delay": 1.0,       # seconds, used until there are enough samples
+        "min_delay": 0.2,
+        "budget_ratio": 0.1,        # at most ~10% extra backend load
+        "budget_burst": 10,
+    }
+
+    # Micro-batching of concurrent short translations per target language
+    BATCHING: Dict[str, Any] = {
+        "enabled": os.getenv("TRANSLATION_BATCHING", "true").lower() == "true",
+        "window": float(os.getenv("TRANSLATION_BATCH_WINDOW", "0.005")),  # seconds to collect a batch
+        "max_chars": 1000,          # flush early once a batch reaches this many characters
+        "max_items": 25,
+        "max_text_chars": 200,      # longer texts skip batching
+    }
+
+    # Sentence-level translation memory for long texts
+    SEGMENTATION: Dict[str, Any] = {
+        "enabled": True,
+        "min_chars": 200,           # shorter texts are translated whole
+        "max_segment_chars": 1000,  # longer sentences are cut at spaces
+    }
+
+    # Durable SQLite translation store (L3), evicted after CACHE_TTL["translation"] unused
+    TRANSLATION_STORE: Dict[str, Any] = {
+        "enabled": True,
+        "flush_interval": 5,        # seconds between batched writes
+        "batch_size": 500,          # flush early once this many writes are pending
+        "warm_entries": int(os.getenv("TRANSLATION_WARM_ENTRIES", "5000")),  # hottest entries loaded at startup
+        "purge_interval": 3600,
+    }
+
+    # Coalescing of identical in-flight translations
+    TRANSLATION_COALESCING: Dict[str, Any] = {
+        "redis_lock": os.getenv("TRANSLATION_REDIS_LOCK", "false").lower() == "true",  # cross-process
+        "lock_ttl": 15,             # seconds
+        "lock_wait": 5.0,           # seconds to wait for another process
+        "poll_interval": 0.05,
+    }
+
+    # Language detection
+    DETECTION: Dict[str, Any] = {
+        "workers": 2,               # threads for the statistical fallback
+        "seed": 0,                  # makes langdetect deterministic
+        "sample_chars": 500,        # only look at the start of long texts
+        "script_threshold": 0.6,    # share of letters in one script to short-circuit
+    }
+
+    # Quiz questions built ahead of time per (language, difficulty)
+    QUIZ_POOL: Dict[str, Any] = {
+        "size": 10,                 # ready questions kept per pool
+        "concurrency": 4,           # questions built in parallel while refilling
+        "prefill": False,           # fill every pool at startup instead of on first use
+    }
+
+    # Offline QUIZ_DATA translations (python scripts/build_quiz_vocabulary.py or /admin_build_vocabulary)
+    QUIZ_VOCABULARY: Dict[str, Any] = {
+        "path": "data/quiz_vocabulary.db",
+        "batch_size": 50,           # words translated together per language
+    }
+
+    # Achievement engine (utils/achievements.py)
+    ACHIEVEMENTS: Dict[str, Any] = {
+        "cached_users": 10000,      # unlocked bitsets kept in memory
+    }
+
+    # Quiz leaderboards (Redis sorted sets, SQLite scores table as fallback)
+    RANKING: Dict[str, Any] = {
+        "page_size": 10,
+        "rebuild_chunk": 1000,      # members per ZADD when rebuilding a board in Redis
+        "snapshot_interval": 15,    # seconds between checks for leaderboards to re-render
+        "snapshot_max_age": 300,    # re-render at least this often, e.g. to pick up renames
+        "snapshot_idle": 1800,      # drop snapshots nobody viewed for this long
+        "period_ttl": {             # seconds a period board outlives its last update
+            "week": 14 * 86400,
+            "month": 62 * 86400,
+        },
+    }
+
+    # Central deadline scheduler (utils/scheduler.py) for quiz and view timeouts
+    SCHEDULER: Dict[str, Any] = {
+        "max_pending": 100000,      # scheduling fails past this many live deadlines
+    }
+
+    # /translate_history
+    HISTORY_TRANSLATION: Dict[str, Any] = {
+        "max_messages": 5000,
+        "concurrency": 8,           # messages detected/translated in parallel
+        "progress_interval": 3.0,   # seconds between progress updates
+    }
+
+    # Auto-translate channels
+    AUTO_TRANSLATE: Dict[str, Any] = {
+        "debounce": 1.0,            # seconds of quiet before a burst is translated
+        "max_delay": 3.0,           # never hold a message longer than this
+        "max_targets": 5,
+        "webhook_name": "Translator",
+    }
+
     # Rate Limits
     RATE_LIMITS: Dict[str, Dict[str, Any]] = {
         "translate": {"limit": 30, "window": 60},      # 30 per minute
         "quiz": {"limit": 5, "window": 60},            # 5 per minute
         "pronounce": {"limit": 10, "window": 60},      # 10 per minute
         "word_of_day": {"limit": 20, "window": 3600},  # 20 per hour
+        "default": {"limit": 20, "window": 60},        # every other command
     }
+    RATE_LIMIT_LOCAL_MAX_KEYS = 10000  # in-process fallback when Redis is down
     
     # Supported Languages
     SUPPORTED_LANGUAGES = {
@@ -91,12 +254,20 @@ class Config:
     # Paths
     AUDIO_CACHE_DIR = "audio_cache"
     
+    # Text-to-speech, cached on disk in AUDIO_CACHE_DIR (expiry: CACHE_TTL["tts"])
+    TTS = {
+        "max_bytes": 512 * 1024 * 1024,  # total size before LRU eviction
+        "chunk_chars": 200,              # long texts are synthesized in parallel chunks
+        "max_chars": 2000,
+    }
+    
     # Feature flags
     FEATURES = {
         "tts_enabled": True,
         "quiz_enabled": True,
         "word_of_day_enabled": True,
         "language_exchange_enabled": True,
+        "auto_translate_enabled": True,
         "voice_rooms_enabled": True,
         "tournaments_enabled": True,
     }
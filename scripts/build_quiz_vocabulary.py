@@ -0,0 +1,45 @@
+"""Build or refresh the offline quiz vocabulary (every QUIZ_DATA word in every supported language).
+
+Usage:
+    python scripts/build_quiz_vocabulary.py [--full] [--languages ko,ru]
+
+Only (word, language) pairs missing from the artifact are translated, so
+rerunning after editing quiz_data.py is cheap. The bot loads the result
+from Config.QUIZ_VOCABULARY["path"] at startup.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import cache
+from utils.translator import translator
+from cogs.quiz.vocabulary import Vocabulary
+
+async def build(full: bool, languages):
+    await cache.connect()
+    await translator.start()
+    try:
+        vocabulary = Vocabulary()
+        added = await vocabulary.build(languages=languages, full=full)
+    finally:
+        await translator.close()
+        await cache.close()
+    return added, len(vocabulary)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="retranslate the selected languages from scratch")
+    parser.add_argument("--languages", help="comma-separated codes, default: all supported")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    languages = args.languages.split(",") if args.languages else None
+    added, total = asyncio.run(build(args.full, languages))
+    print(f"Added {added} translations, {total} in the vocabulary")
+
+if __name__ == "__main__":
+    main()
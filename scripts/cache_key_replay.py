@@ -0,0 +1,75 @@
+"""Replay a message corpus and compare cache hit rates of the v1 and v2 key schemes.
+
+Usage:
+    python scripts/cache_key_replay.py corpus.txt --target en
+
+The corpus is one message per line, or JSON lines with "text" and an
+optional "target". Hit rate assumes an unbounded cache: every request
+whose key was already seen counts as a hit.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import cache
+from utils.text import canonicalize
+
+def load_corpus(path: str, default_target: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                yield item["text"], item.get("target", default_target)
+            else:
+                yield line, default_target
+
+def detect_v1(text: str) -> str:
+    # v1 keyed on the unseeded langdetect result, exactly like the old code path
+    from langdetect import detect
+    try:
+        return detect(text)
+    except Exception:
+        return "auto"
+
+def replay(path: str, default_target: str):
+    seen_v1, seen_v2 = set(), set()
+    hits_v1 = hits_v2 = total = 0
+
+    for text, target in load_corpus(path, default_target):
+        total += 1
+
+        key_v1 = cache._legacy_translation_key(text, detect_v1(text), target)
+        hits_v1 += key_v1 in seen_v1
+        seen_v1.add(key_v1)
+
+        core, _ = canonicalize(text)
+        key_v2 = cache._translation_key(core, "auto", target)
+        hits_v2 += key_v2 in seen_v2
+        seen_v2.add(key_v2)
+
+    return total, hits_v1, len(seen_v1), hits_v2, len(seen_v2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus")
+    parser.add_argument("--target", default="en")
+    args = parser.parse_args()
+
+    total, hits_v1, keys_v1, hits_v2, keys_v2 = replay(args.corpus, args.target)
+    if not total:
+        print("Corpus is empty")
+        return
+
+    print(f"Requests:        {total}")
+    print(f"v1 hit rate:     {hits_v1 / total:.1%} ({keys_v1} distinct keys)")
+    print(f"v2 hit rate:     {hits_v2 / total:.1%} ({keys_v2} distinct keys)")
+    print(f"Backend calls saved by v2: {keys_v1 - keys_v2}")
+
+if __name__ == "__main__":
+    main()
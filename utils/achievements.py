@@ -0,0 +1,119 @@
+import logging
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger('TranslatorBot')
+
+@dataclass(frozen=True)
+class Achievement:
+    name: str            # shown to users and stored, e.g. "🎯 First Steps"
+    metric: str          # e.g. "quiz.total_questions"
+    threshold: float     # unlocked once the metric reaches this value
+    bit: int
+    condition: Optional[Callable[[Dict[str, float]], bool]] = None  # extra check on the same values
+
+class AchievementEngine:
+    """Data-driven achievements with a cached unlocked bitset per user
+
+    Any cog can register achievements on a metric it already tracks and
+    report new values with update(); only thresholds the values reached
+    that are not yet unlocked are evaluated, and nothing is queried for
+    users whose bitset is cached.
+    """
+
+    def __init__(self):
+        self.achievements: List[Achievement] = []
+        self._by_name: Dict[str, Achievement] = {}
+        # metric: (sorted thresholds, masks[i] = bits of the first i thresholds)
+        self._metrics: Dict[str, Tuple[List[float], List[int]]] = {}
+        self._unlocked: "OrderedDict[int, int]" = OrderedDict()
+        self.max_users = Config.ACHIEVEMENTS["cached_users"]
+        self.store = None
+
+    def attach(self, store):
+        """Persist unlocks through store.get_user_achievements / store.add_achievements"""
+        if store is self.store:
+            return
+        self.store = store
+        self._unlocked.clear()
+
+    def detach(self, store):
+        """Stop persisting through store, if it is still the one attached"""
+        if self.store is store:
+            self.store = None
+            self._unlocked.clear()
+
+    def register(self, name: str, metric: str, threshold: float,
+                 condition: Optional[Callable[[Dict[str, float]], bool]] = None):
+        if name in self._by_name:
+            return
+        achievement = Achievement(name, metric, threshold, len(self.achievements), condition)
+        self.achievements.append(achievement)
+        self._by_name[name] = achievement
+
+        entries = sorted((a for a in self.achievements if a.metric == metric), key=lambda a: a.threshold)
+        masks = [0]
+        for entry in entries:
+            masks.append(masks[-1] | 1 << entry.bit)
+        self._metrics[metric] = ([entry.threshold for entry in entries], masks)
+
+    async def _unlocked_mask(self, user_id: int) -> int:
+        mask = self._unlocked.get(user_id)
+        if mask is not None:
+            self._unlocked.move_to_end(user_id)
+            return mask
+
+        metrics.incr("achievements.load")
+        mask = 0
+        for name in await self.store.get_user_achievements(user_id):
+            achievement = self._by_name.get(name)
+            if achievement:
+                mask |= 1 << achievement.bit
+        self._remember(user_id, mask)
+        return mask
+
+    def _remember(self, user_id: int, mask: int):
+        self._unlocked[user_id] = mask
+        self._unlocked.move_to_end(user_id)
+        while len(self._unlocked) > self.max_users:
+            self._unlocked.popitem(last=False)
+
+    async def update(self, user_id: int, values: Dict[str, float]) -> List[str]:
+        """Report current metric values for a user, returns the names of newly unlocked achievements"""
+        if self.store is None:
+            return []
+
+        reached = 0
+        for metric, value in values.items():
+            index = self._metrics.get(metric)
+            if index:
+                thresholds, masks = index
+                reached |= masks[bisect_right(thresholds, value)]
+        if not reached:
+            return []
+
+        unlocked = await self._unlocked_mask(user_id)
+        pending = reached & ~unlocked
+        candidates = []
+        while pending:
+            lowest = pending & -pending
+            achievement = self.achievements[lowest.bit_length() - 1]
+            if achievement.condition is None or achievement.condition(values):
+                candidates.append(achievement)
+            pending ^= lowest
+        if not candidates:
+            return []
+
+        unlocked_now = await self.store.add_achievements(user_id, [a.name for a in candidates])
+        for achievement in candidates:
+            unlocked |= 1 << achievement.bit
+        # Merge with whatever a concurrent update cached meanwhile
+        self._remember(user_id, unlocked | self._unlocked.get(user_id, 0))
+        metrics.incr("achievements.unlocked", len(unlocked_now))
+        return unlocked_now
+
+achievements = AchievementEngine()
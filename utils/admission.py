@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger('TranslatorBot')
+
+class AdmissionRejected(Exception):
+    """Raised when a backend's wait queue is full or a caller waited too long"""
+
+class Throttled(Exception):
+    """Raised by backends when the provider asks us to slow down (HTTP 429)"""
+
+class AdmissionController:
+    """Token bucket + AIMD concurrency limit + jittered backoff in front of one backend"""
+
+    def __init__(self, name: str, settings: dict):
+        self.name = name
+        self.rate = settings["rate"]
+        self.burst = settings["burst"]
+        self.min_limit = settings["min_concurrency"]
+        self.max_limit = settings["max_concurrency"]
+        self.max_queue = settings["max_queue"]
+        self.max_wait = settings["max_wait"]
+        self.latency_target = settings["latency_target"]
+        self.backoff_base = settings["backoff_base"]
+        self.backoff_max = settings["backoff_max"]
+
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        self.backoff_until = 0.0
+        self.consecutive_throttles = 0
+        self._cond = asyncio.Condition()
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Admit the call, run it and feed the outcome back into the limits"""
+        await self._admit()
+        started = time.monotonic()
+        try:
+            result = await call()
+        except Throttled:
+            await self._release(self._on_throttled)
+            raise
+        except asyncio.CancelledError:
+            await self._release(None)
+            raise
+        except Exception:
+            await self._release(self._on_error)
+            raise
+        await self._release(lambda: self._on_success(time.monotonic() - started))
+        return result
+
+    async def _admit(self):
+        if self.waiting >= self.max_queue:
+            metrics.incr(f"admission.{self.name}.rejected")
+            raise AdmissionRejected(f"{self.name} is saturated ({self.waiting} requests waiting)")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            metrics.incr(f"admission.{self.name}.rejected")
+            raise AdmissionRejected(f"{self.name} did not admit the request within {self.max_wait}s")
+        finally:
+            self.waiting -= 1
+
+    async def _acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            while True:
+                now = time.monotonic()
+                if now < self.backoff_until:
+                    await asyncio.sleep(self.backoff_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+                self.refilled_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        except BaseException:
+            await self._release(None)
+            raise
+
+    async def _release(self, adjust):
+        async with self._cond:
+            self.in_flight -= 1
+            if adjust:
+                adjust()
+            self._cond.notify_all()
+
+    def _on_success(self, latency: float):
+        self.consecutive_throttles = 0
+        if latency > self.latency_target:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            # Additive increase: roughly +1 per limit's worth of successful calls
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_error(self):
+        self.limit = max(self.min_limit, self.limit * 0.7)
+
+    def _on_throttled(self):
+        self.limit = max(self.min_limit, self.limit * 0.5)
+        self.consecutive_throttles += 1
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** self.consecutive_throttles)
+        backoff = random.uniform(ceiling / 2, ceiling)
+        self.backoff_until = max(self.backoff_until, time.monotonic() + backoff)
+        metrics.incr(f"admission.{self.name}.throttled")
+        logger.warning(f"{self.name} is throttling us, backing off {backoff:.1f}s (limit {self.limit:.1f})")
+
+class AdmissionRegistry:
+    def __init__(self):
+        self.controllers: Dict[str, AdmissionController] = {}
+
+    def get(self, name: str) -> AdmissionController:
+        controller = self.controllers.get(name)
+        if controller is None:
+            settings = {**Config.ADMISSION["default"], **Config.ADMISSION.get(name, {})}
+            controller = self.controllers[name] = AdmissionController(name, settings)
+        return controller
+
+admission = AdmissionRegistry()
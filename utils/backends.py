@@ -0,0 +1,207 @@
+import aiohttp
+import asyncio
+import hashlib
+import html
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Type
+from config import Config
+from utils.admission import Throttled
+
+GOOGLE_URL = "https://translate.google.com/m"
+# Same result containers deep-translator looks for on the mobile page
+RESULT_PATTERNS = (
+    re.compile(r'<div[^>]*class="t0"[^>]*>(.*?)</div>', re.S),
+    re.compile(r'<div[^>]*class="result-container"[^>]*>(.*?)</div>', re.S),
+)
+
+class TranslationError(Exception):
+    """Raised when the upstream translator fails or times out"""
+
+class TooManyRequests(TranslationError, Throttled):
+    """The provider is rate limiting us, admission control backs off"""
+
+class TranslationBackend(ABC):
+    """Base class for translation providers, which implement translate()"""
+    name = "base"
+    supports_batch = False
+
+    def __init__(self, options: dict):
+        self.options = options
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def translate(self, text: str, source: str, target: str) -> str:
+        """Translate one text"""
+
+    async def translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        """One upstream call for many texts, backends that can't batch translate one by one"""
+        return list(await asyncio.gather(*(self.translate(text, source, target) for text in texts)))
+
+BACKENDS: Dict[str, Type[TranslationBackend]] = {}
+
+def register_backend(cls: Type[TranslationBackend]) -> Type[TranslationBackend]:
+    BACKENDS[cls.name] = cls
+    return cls
+
+def create_backend(name: str) -> TranslationBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend: {name}")
+    return BACKENDS[name](Config.TRANSLATION_BACKENDS.get(name, {}))
+
+@register_backend
+class GoogleBackend(TranslationBackend):
+    """Google Translate mobile page over a shared keep-alive aiohttp pool"""
+    name = "google"
+    supports_batch = True
+
+    def __init__(self, options: dict):
+        super().__init__(options)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        pool_size = self.options.get("pool_size", 32)
+        connector = aiohttp.TCPConnector(
+            limit=pool_size,
+            limit_per_host=pool_size,
+            keepalive_timeout=60,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": "Mozilla/5.0"}
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def translate(self, text: str, source: str, target: str) -> str:
+        params = {"sl": source, "tl": target, "q": text}
+        try:
+            async with self.session.get(GOOGLE_URL, params=params) as response:
+                if response.status == 429:
+                    raise TooManyRequests("Upstream rate limit (429)")
+                if response.status >= 400:
+                    raise TranslationError(f"Upstream returned HTTP {response.status}")
+                body = await response.text()
+        except aiohttp.ClientError as e:
+            raise TranslationError(f"Upstream request failed: {e}") from e
+
+        for pattern in RESULT_PATTERNS:
+            match = pattern.search(body)
+            if match:
+                return html.unescape(match.group(1)).strip()
+        raise TranslationError("No translation found in upstream response")
+
+    async def translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        # Line-per-text; the caller falls back to single calls if lines don't map back 1:1
+        if any("\n" in text for text in texts):
+            raise TranslationError("Batch texts must be single-line")
+        translated = await self.translate("\n".join(texts), source, target)
+        lines = [line.strip() for line in translated.split("\n")]
+        if len(lines) != len(texts):
+            raise TranslationError(f"Batch split mismatch ({len(lines)} lines for {len(texts)} texts)")
+        return lines
+
+@register_backend
+class DeepTranslatorBackend(TranslationBackend):
+    """deep-translator's GoogleTranslator in a bounded thread pool"""
+    name = "google_executor"
+
+    def __init__(self, options: dict):
+        super().__init__(options)
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+
+    async def start(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.options.get("workers", 8),
+            thread_name_prefix="translator"
+        )
+
+    async def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def translate(self, text: str, source: str, target: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._translate_sync, text, source, target)
+
+    def _translate_sync(self, text: str, source: str, target: str) -> str:
+        # GoogleTranslator mutates its params on every call, so keep one per thread
+        from deep_translator import GoogleTranslator
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source, target))
+        if translator is None:
+            translator = translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        try:
+            return translator.translate(text)
+        except Exception as e:
+            raise TranslationError(str(e)) from e
+
+@register_backend
+class LocalBackend(TranslationBackend):
+    """Deterministic offline stand-in for load tests, with simulated latency and errors"""
+    name = "local"
+    supports_batch = True
+
+    def __init__(self, options: dict):
+        super().__init__(options)
+        self.random = random.Random(options.get("seed", 0))
+
+    async def translate(self, text: str, source: str, target: str) -> str:
+        return (await self.translate_batch([text], source, target))[0]
+
+    async def translate_batch(self, texts: List[str], source: str, target: str) -> List[str]:
+        delay = self.options.get("latency", 0.05) + self.random.uniform(0, self.options.get("jitter", 0.0))
+        if self.random.random() < self.options.get("stall_rate", 0.0):
+            delay += self.options.get("stall_latency", 3.0)
+        await asyncio.sleep(delay)
+
+        if self.random.random() < self.options.get("error_rate", 0.0):
+            raise TranslationError("Simulated backend failure")
+
+        return [self._fake_translation(text, target) for text in texts]
+
+    def _fake_translation(self, text: str, target: str) -> str:
+        digest = hashlib.blake2b(f"{target}:{text}".encode(), digest_size=4).hexdigest()
+        return f"[{target}:{digest}] {text}"
+
+class BackendHealth:
+    """Consecutive-failure circuit breaker with an EWMA of latency"""
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.latency = None
+
+    @property
+    def available(self) -> bool:
+        # After the cooldown the breaker lets calls through again (half-open)
+        return time.monotonic() >= self.open_until
+
+    def record_success(self, latency: float):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.open_until = time.monotonic() + self.cooldown
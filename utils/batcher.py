@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from utils.metrics import metrics
+
+logger = logging.getLogger('TranslatorBot')
+
+class _Batch:
+    __slots__ = ("items", "chars", "timer")
+
+    def __init__(self):
+        self.items: Dict[str, asyncio.Future] = {}
+        self.chars = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class MicroBatcher:
+    """Collects distinct texts per (source, target) for a short window and flushes them as one call
+
+    `flush` receives the texts of a batch and returns one result per text,
+    either a translation or the exception raised for that text.
+    """
+
+    def __init__(self, flush: Callable[[List[str], str, str], Awaitable[List]],
+                 window: float, max_chars: int, max_items: int):
+        self.flush = flush
+        self.window = window
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self._pending: Dict[Tuple[str, str], _Batch] = {}
+        self._running = set()
+
+    async def submit(self, text: str, source: str, target: str) -> str:
+        key = (source, target)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch()
+            loop = asyncio.get_running_loop()
+            batch.timer = loop.call_later(self.window, self._flush, key, batch)
+
+        future = batch.items.get(text)
+        if future is None:
+            future = batch.items[text] = asyncio.get_running_loop().create_future()
+            batch.chars += len(text)
+            if batch.chars >= self.max_chars or len(batch.items) >= self.max_items:
+                self._flush(key, batch)
+        else:
+            metrics.incr("translate.batch.deduplicated")
+
+        # Shielded so one cancelled waiter doesn't cancel the result for the others
+        return await asyncio.shield(future)
+
+    def _flush(self, key: Tuple[str, str], batch: _Batch):
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        if batch.timer:
+            batch.timer.cancel()
+
+        task = asyncio.ensure_future(self._run(key, batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: Tuple[str, str], batch: _Batch):
+        source, target = key
+        texts = list(batch.items)
+        metrics.observe("translate.batch.size", len(texts))
+        try:
+            results = await self.flush(texts, source, target)
+        except Exception as e:
+            results = [e] * len(texts)
+
+        for text, result in zip(texts, results):
+            future = batch.items[text]
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
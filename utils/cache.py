@@ -1,13 +1,69 @@
 
 import redis.asyncio as redis
-from typing import Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 import hashlib
 import json
 import logging
+import time
+import uuid
 from config import Config
+from utils.metrics import metrics
+from utils.text import normalize_text
 
 logger = logging.getLogger('TranslatorBot')
 
+KEY_VERSION = Config.CACHE_KEYS["version"]
+TRANSLATION_KEY_VERSION = Config.CACHE_KEYS["translation_version"]
+
+# Only delete the lock if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry TTL and an approximate byte budget"""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self._data: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self.delete(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: int):
+        entry_size = len(key) + len(value.encode())
+        if entry_size > self.max_bytes:
+            return
+        self.delete(key)
+        self._data[key] = (value, time.monotonic() + ttl, entry_size)
+        self.size += entry_size
+        while self.size > self.max_bytes or len(self._data) > self.max_entries:
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.size -= evicted_size
+            metrics.incr("cache.l1.evicted")
+
+    def delete(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
 class RedisCache:
     def __init__(self):
         self.url = f"redis://{Config.REDIS_PASSWORD}@{Config.REDIS_HOST}:{Config.REDIS_PORT}/{Config.REDIS_DB}"
@@ -16,6 +72,8 @@ class RedisCache:
              
         self.redis: Optional[redis.Redis] = None
         self.connected = False
+        self.local = LocalCache(Config.L1_CACHE["max_bytes"], Config.L1_CACHE["max_entries"])
+        self.store = None  # durable L3 for translations, see attach_store
         
     async def connect(self):
         """Connect to Redis"""
@@ -40,66 +98,195 @@ class RedisCache:
             logger.info("Redis disconnected")
     
     def _hash_key(self, text: str) -> str:
+        """Full-width digest for versioned keys, text should already be canonical"""
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def _legacy_hash_key(self, text: str) -> str:
         return hashlib.md5(text.encode()).hexdigest()[:16]
+
+    def _translation_key(self, text: str, source: str, target: str) -> str:
+        # source is what the backend is called with ("auto" or explicit), not the detected language
+        return f"translate:v{TRANSLATION_KEY_VERSION}:{self._hash_key(text)}:{source}:{target}"
+
+    def _legacy_translation_key(self, text: str, source: str, target: str) -> str:
+        return f"translate:{self._legacy_hash_key(text)}:{source}:{target}"
     
-    async def get_translation(self, text: str, source: str, target: str) -> Optional[str]:
-        if not self.connected: 
+    def _local_ttl(self, namespace: str) -> int:
+        ttl = Config.CACHE_TTL[namespace]
+        return min(ttl, Config.L1_CACHE["ttl_overrides"].get(namespace, ttl))
+
+    async def _get(self, key: str, namespace: str) -> Optional[str]:
+        """Read-through: L1 first, then Redis (refilling L1)"""
+        value = self.local.get(key)
+        if value is not None:
+            metrics.incr("cache.l1.hit")
+            return value
+        metrics.incr("cache.l1.miss")
+
+        if not self.connected:
             return None
         try:
-            key = f"translate:{self._hash_key(text)}:{source}:{target}"
-            return await self.redis.get(key)
+            value = await self.redis.get(key)
         except Exception as e:
             logger.error(f"Redis get error: {e}")
             return None
-    
-    async def set_translation(self, text: str, source: str, target: str, translation: str) -> bool:
+
+        if value is not None:
+            self.local.set(key, value, self._local_ttl(namespace))
+        return value
+
+    async def _set(self, key: str, namespace: str, value: str) -> bool:
+        """Write-through: L1 always, Redis when connected"""
+        self.local.set(key, value, self._local_ttl(namespace))
         if not self.connected:
-            return False
+            return True
         try:
-            key = f"translate:{self._hash_key(text)}:{source}:{target}"
-            await self.redis.setex(key, Config.CACHE_TTL["translation"], translation)
+            await self.redis.setex(key, Config.CACHE_TTL[namespace], value)
             return True
         except Exception as e:
             logger.error(f"Redis set error: {e}")
             return False
+    
+    def attach_store(self, store):
+        """Use a durable store (utils.translation_store) as L3 for translations"""
+        self.store = store
 
-    async def get_detected_language(self, text: str) -> Optional[str]:
-        if not self.connected:
-            return None
-        try:
-            key = f"detect:{self._hash_key(text)}"
-            return await self.redis.get(key)
-        except:
+    async def warm(self, entries: List[Tuple[str, str]], namespace: str = "translation") -> int:
+        """Preload (key, value) pairs into L1 and, in one pipeline, into Redis"""
+        ttl = self._local_ttl(namespace)
+        for key, value in entries:
+            self.local.set(key, value, ttl)
+        if self.connected and entries:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key, value in entries:
+                        pipe.set(key, value, ex=Config.CACHE_TTL[namespace], nx=True)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis warm-up error: {e}")
+        return len(entries)
+
+    async def get_translation(self, text: str, source: str, target: str) -> Optional[str]:
+        key = self._translation_key(text, source, target)
+        value = await self._get(key, "translation")
+        if self.store:
+            if value is not None:
+                self.store.touch(key)
+            else:
+                value = await self.store.get(key)
+                if value is not None:
+                    await self._set(key, "translation", value)
+        return value
+    
+    async def set_translation(self, text: str, source: str, target: str, translation: str) -> bool:
+        key = self._translation_key(text, source, target)
+        if self.store:
+            self.store.put(key, translation)
+        return await self._set(key, "translation", translation)
+
+    async def get_translations(self, text: str, source: str, targets: List[str]) -> Dict[str, Optional[str]]:
+        """Look up several targets at once: L1 first, then one MGET for the rest"""
+        keys = {target: self._translation_key(text, source, target) for target in targets}
+        results: Dict[str, Optional[str]] = {}
+        missing = []
+        for target, key in keys.items():
+            value = self.local.get(key)
+            if value is not None:
+                metrics.incr("cache.l1.hit")
+                results[target] = value
+            else:
+                metrics.incr("cache.l1.miss")
+                missing.append(target)
+
+        if missing and self.connected:
+            try:
+                values = await self.redis.mget([keys[target] for target in missing])
+            except Exception as e:
+                logger.error(f"Redis mget error: {e}")
+                values = [None] * len(missing)
+            ttl = self._local_ttl("translation")
+            for target, value in zip(missing, values):
+                if value is not None:
+                    self.local.set(keys[target], value, ttl)
+                    results[target] = value
+
+        if self.store:
+            for target in results:
+                self.store.touch(keys[target])
+            missing = [target for target in targets if target not in results]
+            if missing:
+                stored = await self.store.get_many([keys[target] for target in missing])
+                for target in missing:
+                    value = stored.get(keys[target])
+                    if value is not None:
+                        await self._set(keys[target], "translation", value)
+                        results[target] = value
+
+        return {target: results.get(target) for target in targets}
+
+    async def get_legacy_translation(self, text: str, source: str, target: str) -> Optional[str]:
+        """Read a pre-v2 entry (raw text, detected source) during the migration window"""
+        if not Config.CACHE_KEYS["legacy_read"]:
             return None
+        value = await self._get(self._legacy_translation_key(text, source, target), "translation")
+        if value is not None:
+            metrics.incr("cache.legacy.hit")
+        return value
+
+    def _detect_key(self, text: str) -> str:
+        return f"detect:v{KEY_VERSION}:{self._hash_key(normalize_text(text))}"
+
+    async def get_detected_language(self, text: str) -> Optional[str]:
+        key = self._detect_key(text)
+        value = await self._get(key, "language_detect")
+        if value is None and Config.CACHE_KEYS["legacy_read"]:
+            value = await self._get(f"detect:{self._legacy_hash_key(text)}", "language_detect")
+            if value is not None:
+                metrics.incr("cache.legacy.hit")
+                await self._set(key, "language_detect", value)
+        return value
 
     async def set_detected_language(self, text: str, language: str) -> bool:
-        if not self.connected: 
-             return False
-        try:
-            key = f"detect:{self._hash_key(text)}"
-            await self.redis.setex(key, Config.CACHE_TTL["language_detect"], language)
-            return True
-        except:
-            return False
+        return await self._set(self._detect_key(text), "language_detect", language)
+
+    async def set_source_text(self, text: str) -> str:
+        """Store text under its content hash, the compact key handed to stateless buttons"""
+        key = self._hash_key(normalize_text(text))
+        await self._set(f"text:v{KEY_VERSION}:{key}", "source_text", text)
+        return key
+
+    async def get_source_text(self, key: str) -> Optional[str]:
+        return await self._get(f"text:v{KEY_VERSION}:{key}", "source_text")
 
     async def get_user_settings(self, user_id: int) -> Optional[dict]:
-        if not self.connected:
-            return None
+        data = await self._get(f"user:{user_id}:settings", "user_settings")
         try:
-            key = f"user:{user_id}:settings"
-            data = await self.redis.get(key)
             return json.loads(data) if data else None
-        except:
+        except ValueError:
             return None
             
     async def set_user_settings(self, user_id: int, settings: dict) -> bool:
+        return await self._set(f"user:{user_id}:settings", "user_settings", json.dumps(settings))
+
+    async def acquire_lock(self, name: str, ttl_ms: int) -> Optional[str]:
+        """Try to take a cross-process lock, returns the owner token on success
+
+        None means another process holds the lock. Redis errors raise, so
+        callers can tell them apart and not wait on a holder that may not exist.
+        """
+        if not self.connected:
+            raise ConnectionError("Redis is not connected")
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(f"lock:{name}", token, nx=True, px=ttl_ms)
+        return token if acquired else None
+
+    async def release_lock(self, name: str, token: str) -> bool:
         if not self.connected:
             return False
         try:
-            key = f"user:{user_id}:settings"
-            await self.redis.setex(key, Config.CACHE_TTL["user_settings"], json.dumps(settings))
-            return True
-        except:
+            return bool(await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token))
+        except Exception as e:
+            logger.error(f"Redis unlock error: {e}")
             return False
             
 cache = RedisCache()
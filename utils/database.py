@@ -1,7 +1,8 @@
 
 import aiosqlite
+import json
 import logging
-from typing import List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple
 import os
 
 logger = logging.getLogger('TranslatorBot')
@@ -28,6 +29,11 @@ class Database:
         await self.conn.execute(sql, parameters)
         await self.conn.commit()
 
+    async def executemany(self, sql: str, parameters: List[Tuple]) -> None:
+        if not self.conn or not parameters: return
+        await self.conn.executemany(sql, parameters)
+        await self.conn.commit()
+
     async def fetchval(self, sql: str, parameters: Tuple = ()) -> Any:
         if not self.conn: return None
         async with self.conn.execute(sql, parameters) as cursor:
@@ -120,6 +126,25 @@ class Database:
             times_correct INTEGER DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+
+        -- Durable translation store (L3 behind Redis), keyed like the Redis cache
+        CREATE TABLE IF NOT EXISTS translations (
+            cache_key TEXT PRIMARY KEY,
+            translation TEXT NOT NULL,
+            hits INTEGER DEFAULT 0,
+            last_used INTEGER NOT NULL, -- unix time, drives TTL eviction
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_translations_hits ON translations(hits DESC);
+        CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used);
+
+        -- Auto-translate channels
+        CREATE TABLE IF NOT EXISTS auto_translate_channels (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            targets TEXT NOT NULL, -- JSON list of language codes
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
         """
         await self.conn.executescript(schema)
         await self.conn.commit()
@@ -140,3 +165,60 @@ class Database:
                 preferred_language = excluded.preferred_language,
                 updated_at = CURRENT_TIMESTAMP
         """, (user_id, lang))
+
+    async def get_auto_translate_channels(self) -> Dict[int, List[str]]:
+        """Get all auto-translate channels with their target languages"""
+        rows = await self.fetchall("SELECT channel_id, targets FROM auto_translate_channels")
+        return {row["channel_id"]: json.loads(row["targets"]) for row in rows}
+
+    async def set_auto_translate_channel(self, channel_id: int, guild_id: int, targets: List[str]):
+        await self.execute("""
+            INSERT INTO auto_translate_channels (channel_id, guild_id, targets)
+            VALUES (?, ?, ?)
+            ON CONFLICT(channel_id) DO UPDATE SET targets = excluded.targets
+        """, (channel_id, guild_id, json.dumps(targets)))
+
+    async def remove_auto_translate_channel(self, channel_id: int):
+        await self.execute("DELETE FROM auto_translate_channels WHERE channel_id = ?", (channel_id,))
+
+    async def get_stored_translations(self, keys: List[str], min_last_used: int) -> Dict[str, str]:
+        """Get unexpired translations by cache key"""
+        found = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self.fetchall(
+                f"SELECT cache_key, translation FROM translations WHERE cache_key IN ({placeholders}) AND last_used > ?",
+                (*chunk, min_last_used)
+            )
+            found.update({row["cache_key"]: row["translation"] for row in rows})
+        return found
+
+    async def save_translations(self, rows: List[Tuple[str, str, int]]):
+        """Upsert (cache_key, translation, last_used) rows in one transaction"""
+        await self.executemany("""
+            INSERT INTO translations (cache_key, translation, last_used)
+            VALUES (?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                translation = excluded.translation,
+                last_used = excluded.last_used
+        """, rows)
+
+    async def touch_translations(self, rows: List[Tuple[int, int, str]]):
+        """Apply batched (hits, last_used, cache_key) updates"""
+        await self.executemany(
+            "UPDATE translations SET hits = hits + ?, last_used = ? WHERE cache_key = ?", rows
+        )
+
+    async def get_hot_translations(self, limit: int, min_last_used: int) -> List[Tuple[str, str]]:
+        rows = await self.fetchall("""
+            SELECT cache_key, translation FROM translations
+            WHERE last_used > ?
+            ORDER BY hits DESC
+            LIMIT ?
+        """, (min_last_used, limit))
+        return [(row["cache_key"], row["translation"]) for row in rows]
+
+    async def purge_translations(self, min_last_used: int):
+        await self.execute("DELETE FROM translations WHERE last_used <= ?", (min_last_used,))
+
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from config import Config
+from utils.cache import cache
+from utils.metrics import metrics
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger('TranslatorBot')
+
+# Scripts that map to exactly one of the supported languages
+SCRIPT_RANGES = {
+    "ko": ((0xAC00, 0xD7AF), (0x1100, 0x11FF), (0x3130, 0x318F)),  # Hangul
+    "ru": ((0x0400, 0x04FF), (0x0500, 0x052F)),                    # Cyrillic
+    "ar": ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)),  # Arabic
+}
+
+def _script_of(char: str) -> Optional[str]:
+    code = ord(char)
+    for lang, ranges in SCRIPT_RANGES.items():
+        for low, high in ranges:
+            if low <= code <= high:
+                return lang
+    return None
+
+class LanguageDetector:
+    def __init__(self):
+        settings = Config.DETECTION
+        self.sample_chars = settings["sample_chars"]
+        self.script_threshold = settings["script_threshold"]
+        self.seed = settings["seed"]
+        self.workers = settings["workers"]
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._flights = SingleFlight("detect.singleflight")
+        self._script_langs = {lang for lang in SCRIPT_RANGES if lang in Config.SUPPORTED_LANGUAGES}
+
+    async def start(self):
+        """Seed langdetect and load its profiles off the event loop"""
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="detect")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._warm_up)
+        logger.info("✅ Language detector ready")
+
+    async def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _warm_up(self):
+        from langdetect import DetectorFactory, detect
+        DetectorFactory.seed = self.seed
+        try:
+            detect("warm up")
+        except Exception:
+            pass
+
+    def detect_script(self, text: str) -> Optional[str]:
+        """Cheap answer for texts written in a script only one supported language uses"""
+        counts: Dict[Optional[str], int] = {}
+        letters = 0
+        for char in text[:self.sample_chars]:
+            if not char.isalpha():
+                continue
+            letters += 1
+            lang = _script_of(char)
+            counts[lang] = counts.get(lang, 0) + 1
+
+        if not letters:
+            return None
+        lang = max(counts, key=counts.get)
+        if lang in self._script_langs and counts[lang] / letters >= self.script_threshold:
+            return lang
+        return None
+
+    def _detect_sync(self, texts: List[str]) -> List[str]:
+        from langdetect import detect
+        results = []
+        for text in texts:
+            try:
+                results.append(detect(text[:self.sample_chars]))
+            except Exception:
+                results.append("auto")
+        return results
+
+    async def _detect_statistical(self, texts: List[str]) -> List[str]:
+        if not self.executor:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._detect_sync, texts)
+
+    async def detect(self, text: str) -> str:
+        """Detect the language of a text, returns 'auto' if unknown"""
+        lang = self.detect_script(text)
+        if lang:
+            metrics.incr("detect.script")
+            return lang
+
+        cached = await cache.get_detected_language(text)
+        if cached:
+            return cached
+
+        return await self._flights.do(text, lambda: self._detect_and_store(text))
+
+    async def _detect_and_store(self, text: str) -> str:
+        metrics.incr("detect.statistical")
+        lang = (await self._detect_statistical([text]))[0]
+        if lang != "auto":
+            await cache.set_detected_language(text, lang)
+        return lang
+
+    async def detect_many(self, texts: List[str]) -> List[str]:
+        """Detect many texts at once: one executor job for all cache misses"""
+        results: Dict[str, str] = {}
+        unresolved: List[str] = []
+
+        for text in dict.fromkeys(texts):
+            lang = self.detect_script(text)
+            if lang:
+                metrics.incr("detect.script")
+                results[text] = lang
+            else:
+                unresolved.append(text)
+
+        cached = await asyncio.gather(*(cache.get_detected_language(text) for text in unresolved))
+        pending = []
+        for text, lang in zip(unresolved, cached):
+            if lang:
+                results[text] = lang
+            else:
+                pending.append(text)
+
+        if pending:
+            metrics.incr("detect.statistical", len(pending))
+            detected = await self._detect_statistical(pending)
+            results.update(zip(pending, detected))
+            await asyncio.gather(*(
+                cache.set_detected_language(text, lang)
+                for text, lang in zip(pending, detected) if lang != "auto"
+            ))
+
+        return [results[text] for text in texts]
+
+detector = LanguageDetector()
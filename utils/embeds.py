@@ -1,7 +1,8 @@
 
 import discord
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from config import Config
 
 class EmbedColors:
     INFO = 0x3498db      
@@ -44,8 +45,8 @@ def create_translation_embed(
         timestamp=datetime.utcnow()
     )
     
-    # Original
-    orig_text = original_text if len(original_text) <= 500 else original_text[:497] + "..."
+    # Original (embed fields hold up to 1024 characters)
+    orig_text = original_text if len(original_text) <= 1024 else original_text[:1021] + "..."
     embed.add_field(
         name=f"📝 Original ({source_flag} {source_name}):",
         value=orig_text,
@@ -53,7 +54,7 @@ def create_translation_embed(
     )
     
     # Translation
-    trans_text = translated_text if len(translated_text) <= 500 else translated_text[:497] + "..."
+    trans_text = translated_text if len(translated_text) <= 1024 else translated_text[:1021] + "..."
     embed.add_field(
         name=f"🎯 Translation ({target_flag} {target_name}):",
         value=trans_text,
@@ -74,6 +75,43 @@ def create_translation_embed(
     
     return embed
 
+def create_multi_translation_embeds(
+    original_text: str,
+    source_lang: str,
+    translations: Dict[str, Tuple[str, bool]],
+    per_page: int = 4
+) -> List[discord.Embed]:
+    """One page per `per_page` languages, translations as (text, cache_hit)"""
+    targets = list(translations)
+    pages = [targets[i:i + per_page] for i in range(0, len(targets), per_page)]
+    cached = sum(1 for _, cache_hit in translations.values() if cache_hit)
+    orig_text = original_text if len(original_text) <= 500 else original_text[:497] + "..."
+    source_info = Config.SUPPORTED_LANGUAGES.get(source_lang, {"flag": "🌍", "name": source_lang.upper()})
+
+    embeds = []
+    for page_number, page in enumerate(pages, 1):
+        embed = discord.Embed(
+            title="🌍 Translate to All",
+            color=EmbedColors.TRANSLATION,
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(
+            name=f"📝 Original ({source_info['flag']} {source_info['name']}):",
+            value=orig_text,
+            inline=False
+        )
+        for target in page:
+            info = Config.SUPPORTED_LANGUAGES.get(target, {"flag": "🌍", "name": target.upper()})
+            text = translations[target][0]
+            embed.add_field(
+                name=f"{info['flag']} {info['name']}",
+                value=text if len(text) <= 500 else text[:497] + "...",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {page_number}/{len(pages)} | Cached: {cached}/{len(translations)}")
+        embeds.append(embed)
+    return embeds
+
 def get_flag(lang_code: str) -> str:
     flags = {
         "ru": "🇷🇺", "en": "🇬🇧", "ko": "🇰🇷",
@@ -0,0 +1,38 @@
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+class Metrics:
+    """In-process counters and bounded latency samples"""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.samples: Dict[str, deque] = {}
+
+    def incr(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def observe(self, name: str, value: float):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(value)
+
+    def percentile(self, name: str, pct: float) -> Optional[float]:
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        data = dict(self.counters)
+        for name in self.samples:
+            p50 = self.percentile(name, 50)
+            p99 = self.percentile(name, 99)
+            data[f"{name}.p50"] = round(p50, 4)
+            data[f"{name}.p99"] = round(p99, 4)
+        return data
+
+metrics = Metrics()
@@ -0,0 +1,116 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import discord
+from discord import app_commands
+from config import Config
+from utils.cache import cache
+from utils.metrics import metrics
+
+logger = logging.getLogger('TranslatorBot')
+
+# GCRA in one round trip: KEYS[1] holds the theoretical arrival time (ms).
+# ARGV: limit, window_ms. Uses the Redis clock so every process agrees.
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local interval = window / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+if new_tat - now > window then
+    return {0, 0, math.ceil(new_tat - now - window)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((window - (new_tat - now)) / interval), 0}
+"""
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds
+    limit: int
+    window: int
+
+class RateLimited(app_commands.CheckFailure):
+    def __init__(self, bucket: str, result: RateLimitResult):
+        self.bucket = bucket
+        self.result = result
+        super().__init__(
+            f"⏳ Slow down! You've used all {result.limit} `{bucket}` requests for this {result.window}s window "
+            f"(0 remaining). Try again in {math.ceil(result.retry_after)}s."
+        )
+
+class RateLimiter:
+    """Config.RATE_LIMITS enforced with GCRA in Redis, or in-process when Redis is down"""
+
+    def __init__(self):
+        self._script = None
+        self._local: Dict[str, float] = {}  # key: theoretical arrival time (ms, monotonic)
+
+    async def hit(self, bucket: str, user_id: int) -> RateLimitResult:
+        rule = Config.RATE_LIMITS.get(bucket, Config.RATE_LIMITS["default"])
+        limit, window = rule["limit"], rule["window"]
+        key = f"ratelimit:{bucket}:{user_id}"
+
+        result = None
+        if cache.connected:
+            result = await self._hit_redis(key, limit, window)
+        if result is None:
+            result = self._hit_local(key, limit, window)
+
+        if not result.allowed:
+            metrics.incr(f"rate_limit.{bucket}.rejected")
+        return result
+
+    async def _hit_redis(self, key: str, limit: int, window: int) -> Optional[RateLimitResult]:
+        try:
+            if self._script is None:
+                self._script = cache.redis.register_script(GCRA_SCRIPT)
+            allowed, remaining, retry_ms = await self._script(keys=[key], args=[limit, window * 1000])
+        except Exception as e:
+            logger.error(f"Redis rate limit error, using local limiter: {e}")
+            return None
+        return RateLimitResult(bool(allowed), int(remaining), int(retry_ms) / 1000, limit, window)
+
+    def _hit_local(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.monotonic() * 1000
+        window_ms = window * 1000
+        interval = window_ms / limit
+
+        if len(self._local) > Config.RATE_LIMIT_LOCAL_MAX_KEYS:
+            self._local = {k: tat for k, tat in self._local.items() if tat > now}
+
+        tat = max(self._local.get(key, now), now)
+        new_tat = tat + interval
+        if new_tat - now > window_ms:
+            return RateLimitResult(False, 0, (new_tat - now - window_ms) / 1000, limit, window)
+
+        self._local[key] = new_tat
+        return RateLimitResult(True, int((window_ms - (new_tat - now)) // interval), 0, limit, window)
+
+    async def check(self, bucket: str, user_id: int):
+        """Raise RateLimited if the user is over the bucket's limit"""
+        result = await self.hit(bucket, user_id)
+        if not result.allowed:
+            raise RateLimited(bucket, result)
+
+rate_limiter = RateLimiter()
+
+def rate_limit_predicate(bucket: str):
+    """Per-user check for Config.RATE_LIMITS[bucket], e.g. for ContextMenu.add_check"""
+    async def predicate(interaction: discord.Interaction) -> bool:
+        await rate_limiter.check(bucket, interaction.user.id)
+        return True
+    return predicate
+
+def rate_limit(bucket: str):
+    """App command decorator enforcing Config.RATE_LIMITS[bucket] per user"""
+    return app_commands.check(rate_limit_predicate(bucket))
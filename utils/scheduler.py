@@ -0,0 +1,140 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+from typing import Any, Callable, List, Optional, Set
+from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger('TranslatorBot')
+
+class Deadline:
+    """A pending callback; a few slots of memory, no task until it fires"""
+
+    __slots__ = ("when", "seq", "callback", "args", "cancelled", "_scheduler")
+
+    def __init__(self, when: float, seq: int, callback: Callable, args: tuple, scheduler: "DeadlineScheduler"):
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._scheduler = scheduler
+
+    def __lt__(self, other: "Deadline") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.callback = self.args = None  # drop references (views, interactions) right away
+            self._scheduler._cancelled()
+
+class DeadlineScheduler:
+    """Every timeout in the bot on one heap, driven by a single task
+
+    Replaces a sleeping coroutine per deadline. Cancelled deadlines are
+    skipped when they surface and the heap is compacted once they
+    outnumber live ones. Lag between a deadline and its callback starting
+    is recorded as scheduler.lag.
+    """
+
+    def __init__(self):
+        self.max_pending = Config.SCHEDULER["max_pending"]
+        self._heap: List[Deadline] = []
+        self._seq = itertools.count()
+        self._cancelled_count = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled_count
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ Deadline scheduler ready")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+        for deadline in self._heap:
+            deadline.cancelled = True
+            deadline.callback = deadline.args = None
+        self._heap.clear()
+        self._cancelled_count = 0
+
+    def has_room(self) -> bool:
+        """False once max_pending deadlines are live; callers fall back to their own timer then"""
+        return len(self) < self.max_pending
+
+    def schedule(self, delay: float, callback: Callable, *args: Any, force: bool = False) -> Deadline:
+        """Call callback(*args) in `delay` seconds; coroutine functions run as their own task then
+
+        Raises RuntimeError past max_pending, unless `force` (room was checked with has_room()
+        before an await, e.g. sending the message the deadline belongs to).
+        """
+        if not force and not self.has_room():
+            metrics.incr("scheduler.rejected")
+            raise RuntimeError(f"Too many pending deadlines ({self.max_pending})")
+        loop = asyncio.get_running_loop()
+        deadline = Deadline(loop.time() + delay, next(self._seq), callback, args, self)
+        heapq.heappush(self._heap, deadline)
+        if self._heap[0] is deadline:
+            self._wakeup.set()
+        metrics.incr("scheduler.scheduled")
+        return deadline
+
+    def _cancelled(self):
+        self._cancelled_count += 1
+        metrics.incr("scheduler.cancelled")
+        if self._cancelled_count > 64 and self._cancelled_count * 2 > len(self._heap):
+            self._heap = [deadline for deadline in self._heap if not deadline.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_count = 0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            timeout = self._heap[0].when - loop.time() if self._heap else None
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            now = loop.time()
+            while self._heap and self._heap[0].when <= now:
+                deadline = heapq.heappop(self._heap)
+                if deadline.cancelled:
+                    self._cancelled_count -= 1
+                    continue
+                metrics.observe("scheduler.lag", now - deadline.when)
+                self._fire(deadline)
+
+    def _fire(self, deadline: Deadline):
+        callback, args = deadline.callback, deadline.args
+        deadline.cancelled = True  # firing twice or cancelling afterwards is a no-op
+        deadline.callback = deadline.args = None
+        metrics.incr("scheduler.fired")
+        try:
+            result = callback(*args)
+        except Exception as e:
+            logger.error(f"Deadline callback error: {e}", exc_info=e)
+            return
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._running.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Deadline callback error: {task.exception()}", exc_info=task.exception())
+
+scheduler = DeadlineScheduler()
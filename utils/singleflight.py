@@ -0,0 +1,26 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from utils.metrics import metrics
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key into one execution"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            metrics.incr(f"{self.name}.executed")
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            metrics.incr(f"{self.name}.coalesced")
+
+        # A cancelled waiter must not cancel the call the others are sharing
+        return await asyncio.shield(task)
@@ -0,0 +1,70 @@
+import re
+import unicodedata
+from typing import List, Tuple
+
+HORIZONTAL_WS_RE = re.compile(r"[^\S\n]+")
+LINE_EDGE_RE = re.compile(r" ?\n ?")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+TRAILING_PUNCT_RE = re.compile(r"[\s.!?…。！？]+$")
+# A final mark repeated, e.g. "!!!" or "???"; mixed runs like "?!" are left alone
+REPEATED_MARK_RE = re.compile(r"([.!?…。！？])\1+$")
+# Sentence ends followed by whitespace, or line breaks
+SEGMENT_BOUNDARY_RE = re.compile(r"(?<=[.!?…。！？])[^\S\n]+|\n+")
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, collapsed spaces, line breaks kept"""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n")
+    text = HORIZONTAL_WS_RE.sub(" ", text)
+    text = LINE_EDGE_RE.sub("\n", text)
+    return BLANK_LINES_RE.sub("\n\n", text).strip()
+
+def split_trailing_punctuation(text: str) -> Tuple[str, str]:
+    """Split trailing punctuation off, e.g. 'Hello!!' into ('Hello', '!!')"""
+    match = TRAILING_PUNCT_RE.search(text)
+    if not match or match.start() == 0:
+        return text, ""
+    return text[:match.start()], match.group(0).strip()
+
+def fold_repeated_mark(text: str) -> Tuple[str, str]:
+    """Split 'Hello!!!' into ('Hello!', '!!!') so repeats share one translation
+
+    A single final mark stays part of the text: a question and a statement
+    translate differently in many languages.
+    """
+    match = REPEATED_MARK_RE.search(text)
+    if not match or match.start() == 0:
+        return text, ""
+    return text[:match.start() + 1], match.group(0)
+
+def canonicalize(text: str) -> Tuple[str, str]:
+    """Returns (core text to translate and key on, punctuation to put back in place of its final mark)"""
+    return fold_repeated_mark(normalize_text(text))
+
+def split_segments(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Split text at sentence and line boundaries into (segment, separator) pairs
+
+    Joining every segment followed by its separator gives back the text.
+    Segments longer than max_chars are cut further at spaces.
+    """
+    segments = []
+    position = 0
+    for match in SEGMENT_BOUNDARY_RE.finditer(text):
+        if match.start() > position:
+            segments.append((text[position:match.start()], match.group(0)))
+        elif segments:
+            segment, separator = segments[-1]
+            segments[-1] = (segment, separator + match.group(0))
+        position = match.end()
+    if position < len(text):
+        segments.append((text[position:], ""))
+
+    result = []
+    for segment, separator in segments:
+        while len(segment) > max_chars:
+            cut = segment.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            result.append((segment[:cut], " " if segment[cut:cut + 1] == " " else ""))
+            segment = segment[cut:].lstrip(" ")
+        result.append((segment, separator))
+    return result
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from config import Config
+from utils.database import Database
+from utils.metrics import metrics
+
+logger = logging.getLogger('TranslatorBot')
+
+class TranslationStore:
+    """Durable SQLite tier behind Redis, written in batches off the request path"""
+
+    def __init__(self):
+        settings = Config.TRANSLATION_STORE
+        self.flush_interval = settings["flush_interval"]
+        self.batch_size = settings["batch_size"]
+        self.purge_interval = settings["purge_interval"]
+        self.ttl = Config.CACHE_TTL["translation"]
+
+        self.db: Optional[Database] = None
+        self._pending_writes: Dict[str, str] = {}
+        self._pending_hits: Counter = Counter()
+        self._flush_now = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_purge = 0.0
+
+    async def start(self, db: Database):
+        self.db = db
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info("✅ Translation store ready")
+
+    async def close(self):
+        if self._task:
+            # Wait for the loop to stop, so a flush it was in the middle of has put back what it swapped out
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def _min_last_used(self) -> int:
+        return int(time.time()) - self.ttl
+
+    def put(self, key: str, translation: str):
+        self._pending_writes[key] = translation
+        if len(self._pending_writes) >= self.batch_size:
+            self._flush_now.set()
+
+    def touch(self, key: str):
+        """Count a cache hit, so warm-up can pick the hottest entries"""
+        self._pending_hits[key] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found = {key: self._pending_writes[key] for key in keys if key in self._pending_writes}
+        missing = [key for key in keys if key not in found]
+        if missing and self.db:
+            found.update(await self.db.get_stored_translations(missing, self._min_last_used()))
+        for key in found:
+            self._pending_hits[key] += 1
+        metrics.incr("cache.l3.hit", len(found))
+        metrics.incr("cache.l3.miss", len(keys) - len(found))
+        return found
+
+    async def hottest(self, limit: int) -> List[tuple]:
+        if not self.db:
+            return []
+        return await self.db.get_hot_translations(limit, self._min_last_used())
+
+    async def flush(self):
+        if not self.db:
+            return
+        writes, self._pending_writes = self._pending_writes, {}
+        hits, self._pending_hits = self._pending_hits, Counter()
+        now = int(time.time())
+        try:
+            await self.db.save_translations([(key, value, now) for key, value in writes.items()])
+        except BaseException as e:
+            # Keep them for the next flush, also when cancelled; writes queued meanwhile are newer
+            self._pending_writes = {**writes, **self._pending_writes}
+            self._pending_hits.update(hits)
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Translation store flush error: {e}")
+            return
+        try:
+            await self.db.touch_translations([(count, now, key) for key, count in hits.items()])
+        except BaseException as e:
+            self._pending_hits.update(hits)
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Translation store flush error: {e}")
+
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self._last_purge = time.monotonic()
+            try:
+                await self.db.purge_translations(self._min_last_used())
+            except Exception as e:
+                logger.error(f"Translation store purge error: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Translation store flush loop error: {e}")
+
+translation_store = TranslationStore()
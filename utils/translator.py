@@ -0,0 +1,369 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import Config
+from utils.admission import AdmissionRejected, admission
+from utils.backends import BackendHealth, TranslationBackend, TranslationError, create_backend
+from utils.batcher import MicroBatcher
+from utils.cache import cache
+from utils.metrics import metrics
+from utils.singleflight import SingleFlight
+from utils.detection import detector
+from utils.text import canonicalize, split_segments, split_trailing_punctuation
+
+logger = logging.getLogger('TranslatorBot')
+
+class HedgeBudget:
+    """Token bucket that caps hedged requests to a share of all requests"""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def deposit(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            metrics.incr("translate.hedge.budget_exhausted")
+            return False
+        self.tokens -= 1
+        return True
+
+class TranslatorClient:
+    def __init__(self):
+        settings = Config.TRANSLATOR
+        self.timeout = settings["timeout"]
+        self.backends: List[TranslationBackend] = []
+        self.health = {}
+        self.started = False
+        self._flights = SingleFlight("translate.singleflight")
+        self._hedge_budget = HedgeBudget(Config.HEDGING["budget_ratio"], Config.HEDGING["budget_burst"])
+        self.batcher = MicroBatcher(
+            self._translate_batch,
+            window=Config.BATCHING["window"],
+            max_chars=Config.BATCHING["max_chars"],
+            max_items=Config.BATCHING["max_items"]
+        )
+
+    async def start(self):
+        """Build the backend fallback chain from Config and open its pools"""
+        settings = Config.TRANSLATOR
+        self.backends = [create_backend(name.strip()) for name in settings["backends"] if name.strip()]
+        self.health = {
+            backend.name: BackendHealth(settings["failure_threshold"], settings["cooldown"])
+            for backend in self.backends
+        }
+        for backend in self.backends:
+            await backend.start()
+        self.started = True
+        logger.info(f"✅ Translator client ready (chain: {' -> '.join(b.name for b in self.backends)})")
+
+    async def close(self):
+        for backend in self.backends:
+            await backend.close()
+        self.started = False
+
+    async def translate(self, text: str, target: str, source: str = "auto", timeout: Optional[float] = None,
+                        detected: Optional[str] = None) -> str:
+        """Translate text without blocking the event loop, falling back along the chain
+
+        With source="auto", `detected` lets short texts be micro-batched with
+        others in the same language; the batch is sent with that language as
+        its source.
+        """
+        if not text or not text.strip():
+            return text
+        if not self.started:
+            await self.start()
+
+        timeout = timeout or self.timeout
+
+        batch_source = self._batch_source(text, source, detected)
+        if batch_source:
+            try:
+                return await asyncio.wait_for(self.batcher.submit(text, batch_source, target), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TranslationError(f"Timed out after {timeout}s")
+
+        return await self._translate_chain(text, source, target, timeout)
+
+    def _batch_source(self, text: str, source: str, detected: Optional[str]) -> Optional[str]:
+        """Source language to batch the text under, None to send it on its own"""
+        settings = Config.BATCHING
+        if not settings["enabled"] or len(text) > settings["max_text_chars"] or "\n" in text:
+            return None
+        chain = self._chain()
+        if not chain or not chain[0].supports_batch:
+            return None
+        if source != "auto":
+            return source
+        # A joined batch gets one source language, so auto texts are grouped by what was detected
+        if detected in Config.SUPPORTED_LANGUAGES:
+            return detected
+        return None
+
+    async def _translate_batch(self, texts: List[str], source: str, target: str) -> List:
+        """Flush callback of the micro-batcher, returns a translation or an exception per text"""
+        backend = self._chain()[0]
+        if len(texts) > 1 and backend.supports_batch:
+            try:
+                results = await self._timed_call(
+                    backend, lambda: backend.translate_batch(texts, source, target), self.timeout, "batch_latency"
+                )
+                metrics.incr("translate.batch.calls")
+                metrics.incr("translate.batch.items", len(texts))
+                return results
+            except (TranslationError, AdmissionRejected) as e:
+                metrics.incr("translate.batch.fallback")
+                logger.warning(f"Batched translation via {backend.name} failed, retrying one by one: {e}")
+
+        return await asyncio.gather(*(
+            self._translate_chain(text, source, target, self.timeout) for text in texts
+        ), return_exceptions=True)
+
+    def _chain(self) -> List[TranslationBackend]:
+        available = [b for b in self.backends if self.health[b.name].available]
+        # If every breaker is open, still try them all rather than fail outright
+        return available or self.backends
+
+    async def _translate_chain(self, text: str, source: str, target: str, timeout: float) -> str:
+        metrics.incr("translate.requests")
+        self._hedge_budget.deposit()
+
+        errors = []
+        chain = self._chain()
+        if chain and Config.HEDGING["enabled"]:
+            primary = chain[0]
+            alternate = chain[1] if len(chain) > 1 else primary
+            tried = []
+            try:
+                return await self._call_hedged(primary, alternate, text, source, target, timeout, tried)
+            except (TranslationError, AdmissionRejected) as e:
+                errors.append(e)
+                logger.warning(f"Translation backend {primary.name} failed: {e}")
+                # The alternate stays in the chain unless the hedge actually went to it
+                chain = [b for b in chain if b not in tried]
+
+        for backend in chain:
+            try:
+                return await self._call_backend(backend, text, source, target, timeout)
+            except (TranslationError, AdmissionRejected) as e:
+                errors.append(e)
+                logger.warning(f"Translation backend {backend.name} failed: {e}")
+
+        if errors and all(isinstance(e, AdmissionRejected) for e in errors):
+            # Every backend is saturated: fail fast instead of queueing more work
+            raise AdmissionRejected("; ".join(str(e) for e in errors))
+        raise TranslationError("; ".join(str(e) for e in errors) or "No translation backends configured")
+
+    def _hedge_delay(self, backend: TranslationBackend) -> float:
+        settings = Config.HEDGING
+        name = f"translate.backend.{backend.name}.latency"
+        samples = metrics.samples.get(name)
+        if not samples or len(samples) < settings["min_samples"]:
+            return settings["initial_delay"]
+        return max(settings["min_delay"], metrics.percentile(name, settings["percentile"]))
+
+    async def _call_hedged(self, primary: TranslationBackend, alternate: TranslationBackend,
+                           text: str, source: str, target: str, timeout: float,
+                           tried: List[TranslationBackend]) -> str:
+        """Send a second request if the primary is slower than its usual tail latency
+
+        Every backend actually called is appended to `tried`.
+        """
+        tried.append(primary)
+        primary_task = asyncio.ensure_future(self._call_backend(primary, text, source, target, timeout))
+        tasks = {primary_task}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+            if done or not self._hedge_budget.withdraw():
+                return await primary_task
+
+            metrics.incr("translate.hedge.sent")
+            tried.append(alternate)
+            hedge_task = asyncio.ensure_future(self._call_backend(alternate, text, source, target, timeout))
+            tasks.add(hedge_task)
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            metrics.incr("translate.hedge.won")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing request is cancelled as soon as there is an answer
+            for task in tasks:
+                task.cancel()
+
+    async def _call_backend(self, backend: TranslationBackend, text: str, source: str, target: str, timeout: float) -> str:
+        return await self._timed_call(backend, lambda: backend.translate(text, source, target), timeout, "latency")
+
+    async def _timed_call(self, backend: TranslationBackend, call: Callable[[], Awaitable[Any]], timeout: float, metric: str):
+        """Run a backend call through admission control with a timeout, feeding health and latency metrics"""
+        health = self.health[backend.name]
+
+        async def timed():
+            started = time.monotonic()
+            result = await asyncio.wait_for(call(), timeout=timeout)
+            return result, time.monotonic() - started
+
+        try:
+            result, latency = await admission.get(backend.name).run(timed)
+        except AdmissionRejected:
+            # Our own limit, not a backend failure
+            raise
+        except asyncio.TimeoutError:
+            health.record_failure()
+            metrics.incr(f"translate.backend.{backend.name}.timeout")
+            raise TranslationError(f"Timed out after {timeout}s")
+        except TranslationError:
+            health.record_failure()
+            metrics.incr(f"translate.backend.{backend.name}.error")
+            raise
+        except Exception as e:
+            health.record_failure()
+            metrics.incr(f"translate.backend.{backend.name}.error")
+            raise TranslationError(str(e)) from e
+
+        health.record_success(latency)
+        metrics.observe(f"translate.backend.{backend.name}.{metric}", latency)
+        return result
+
+    async def translate_cached(self, text: str, target: str, source: str = "auto",
+                               detected: Optional[str] = None) -> Tuple[str, bool]:
+        """Translate through the cache, returns (translation, cache_hit)
+
+        Keys are built from the canonical text, so whitespace variants and
+        repeated final marks ("!!!") share one entry. Identical requests in flight
+        share one backend call; with the Redis lock enabled this also holds
+        across bot processes. `detected` is used to read legacy keys and to
+        batch the backend call; keys stay on `source`.
+        """
+        core, suffix = canonicalize(text)
+        cached = await cache.get_translation(core, source, target)
+        if cached:
+            return self._rejoin(cached, suffix), True
+
+        if detected:
+            legacy = await cache.get_legacy_translation(text, detected, target)
+            if legacy:
+                if not suffix and core == text:
+                    await cache.set_translation(core, source, target, legacy)
+                return legacy, True
+
+        translated, cache_hit = await self._flights.do(
+            (core, source, target),
+            lambda: self._fill_translation(core, target, source, detected)
+        )
+        return self._rejoin(translated, suffix), cache_hit
+
+    async def translate_to_many(self, text: str, targets: List[str], source: str = "auto",
+                                detected: Optional[str] = None) -> Dict[str, Any]:
+        """Translate one text into several languages
+
+        The cache is checked for all targets in one round trip and only the
+        misses go to the backend, concurrently. Returns target -> (translation,
+        cache_hit), or the exception raised for that target.
+        """
+        core, suffix = canonicalize(text)
+        cached = await cache.get_translations(core, source, targets)
+        misses = [target for target in targets if not cached[target]]
+
+        fetched = await asyncio.gather(*(
+            self._flights.do(
+                (core, source, target),
+                lambda target=target: self._fill_translation(core, target, source, detected)
+            )
+            for target in misses
+        ), return_exceptions=True)
+
+        results: Dict[str, Any] = {}
+        for target in targets:
+            if cached[target]:
+                results[target] = (self._rejoin(cached[target], suffix), True)
+        for target, result in zip(misses, fetched):
+            if isinstance(result, Exception):
+                results[target] = result
+            else:
+                results[target] = (self._rejoin(result[0], suffix), result[1])
+        return results
+
+    def _rejoin(self, translated: str, suffix: str) -> str:
+        if not suffix:
+            return translated
+        return split_trailing_punctuation(translated)[0] + suffix
+
+    async def _fill_translation(self, text: str, target: str, source: str,
+                                detected: Optional[str] = None) -> Tuple[str, bool]:
+        settings = Config.TRANSLATION_COALESCING
+        lock_name = token = None
+
+        if settings["redis_lock"] and cache.connected:
+            lock_name = cache._translation_key(text, source, target)
+            try:
+                token = await cache.acquire_lock(lock_name, int(settings["lock_ttl"] * 1000))
+            except Exception as e:
+                # Redis is unavailable, so nobody can be waited for: translate without the lock
+                logger.error(f"Redis lock error: {e}")
+                metrics.incr("translate.singleflight.lock_error")
+            else:
+                if token is None:
+                    # Another process is translating this text, wait for its result
+                    cached = await self._wait_for_remote(text, source, target)
+                    if cached:
+                        metrics.incr("translate.singleflight.remote_coalesced")
+                        return cached, True
+
+        try:
+            translated = await self._translate_uncached(text, target, source, detected)
+            await cache.set_translation(text, source, target, translated)
+            return translated, False
+        finally:
+            if token:
+                await cache.release_lock(lock_name, token)
+
+    async def _translate_uncached(self, text: str, target: str, source: str, detected: Optional[str]) -> str:
+        """Long texts are translated per sentence so unchanged sentences come from the cache"""
+        settings = Config.SEGMENTATION
+        if not settings["enabled"] or len(text) < settings["min_chars"]:
+            return await self.translate(text, target, source=source, detected=detected)
+
+        segments = split_segments(text, settings["max_segment_chars"])
+        if len(segments) <= 1:
+            return await self.translate(text, target, source=source, detected=detected)
+
+        metrics.incr("translate.segmented")
+        # Per segment, so a quote in another language is not batched under the text's language
+        languages = await detector.detect_many([segment for segment, _ in segments]) if source == "auto" else [None] * len(segments)
+        results = await asyncio.gather(*(
+            self.translate_cached(segment, target, source, detected=language)
+            for (segment, _), language in zip(segments, languages)
+        ))
+        hits = sum(1 for _, cache_hit in results if cache_hit)
+        metrics.incr("translate.segments.hit", hits)
+        metrics.incr("translate.segments.miss", len(segments) - hits)
+
+        return "".join(
+            translated + separator
+            for (translated, _), (_, separator) in zip(results, segments)
+        )
+
+    async def _wait_for_remote(self, text: str, source: str, target: str) -> Optional[str]:
+        settings = Config.TRANSLATION_COALESCING
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings["lock_wait"]
+        while loop.time() < deadline:
+            await asyncio.sleep(settings["poll_interval"])
+            cached = await cache.get_translation(text, source, target)
+            if cached:
+                return cached
+        return None
+
+translator = TranslatorClient()
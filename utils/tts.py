@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List
+from gtts import gTTS
+from gtts.tts import gTTSError
+from config import Config
+from utils.admission import Throttled, admission
+from utils.metrics import metrics
+from utils.singleflight import SingleFlight
+from utils.text import normalize_text, split_segments
+
+logger = logging.getLogger('TranslatorBot')
+
+INDEX_FILE = "index.json"
+
+def synthesize_speech(text: str, lang: str) -> bytes:
+    """Blocking gTTS call, run it in a thread"""
+    try:
+        fp = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(fp)
+    except gTTSError as e:
+        if e.rsp is not None and e.rsp.status_code == 429:
+            raise Throttled(str(e)) from e
+        raise
+    return fp.getvalue()
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _remove(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class TTSService:
+    """gTTS off the event loop, with a content-addressed MP3 cache in AUDIO_CACHE_DIR"""
+
+    def __init__(self):
+        settings = Config.TTS
+        self.directory = Config.AUDIO_CACHE_DIR
+        self.ttl = Config.CACHE_TTL["tts"]
+        self.max_bytes = settings["max_bytes"]
+        self.chunk_chars = settings["chunk_chars"]
+        self.max_chars = settings["max_chars"]
+
+        # key: {"size", "created", "used"}, least recently used first
+        self.index: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self._flights = SingleFlight("tts")
+        self._index_lock = asyncio.Lock()
+
+    async def start(self):
+        self.index = await asyncio.to_thread(self._load_index)
+        self.total_bytes = sum(entry["size"] for entry in self.index.values())
+        await self._evict()
+        logger.info(f"✅ TTS cache ready ({len(self.index)} files, {self.total_bytes // 1024} KiB)")
+
+    async def close(self):
+        await self._save_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _key(self, text: str, lang: str) -> str:
+        return hashlib.blake2b(f"{lang}:{text}".encode(), digest_size=16).hexdigest()
+
+    def _load_index(self) -> "OrderedDict[str, Dict[str, int]]":
+        """Index file for LRU order, reconciled with what is actually on disk"""
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), encoding="utf-8") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            saved = {}
+
+        entries = {}
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.name.endswith(".mp3"):
+                    continue
+                key = item.name[:-4]
+                stat = item.stat()
+                entry = saved.get(key) or {"created": int(stat.st_mtime), "used": int(stat.st_mtime)}
+                entries[key] = {**entry, "size": stat.st_size}
+        return OrderedDict(sorted(entries.items(), key=lambda item: item[1]["used"]))
+
+    async def _save_index(self):
+        snapshot = json.dumps(self.index)
+        path = os.path.join(self.directory, INDEX_FILE)
+        async with self._index_lock:
+            await asyncio.to_thread(_write_atomic, path, snapshot.encode())
+
+    async def synthesize(self, text: str, lang: str) -> bytes:
+        """MP3 bytes for text, served from disk when we have said it before"""
+        text = normalize_text(text)[:self.max_chars]
+        key = self._key(text, lang)
+
+        entry = self.index.get(key)
+        if entry and time.time() - entry["created"] < self.ttl:
+            try:
+                audio = await asyncio.to_thread(_read_bytes, self._path(key))
+            except FileNotFoundError:
+                self._forget(key)
+            else:
+                entry["used"] = int(time.time())
+                self.index.move_to_end(key)
+                metrics.incr("tts.cache.hit")
+                return audio
+
+        metrics.incr("tts.cache.miss")
+        return await self._flights.do(key, lambda: self._generate(key, text, lang))
+
+    async def _generate(self, key: str, text: str, lang: str) -> bytes:
+        # gTTS fetches its ~100 char parts one by one; long texts go out as parallel chunks
+        chunks = self._chunks(text)
+        parts = await asyncio.gather(*(
+            admission.get("tts").run(lambda chunk=chunk: asyncio.to_thread(synthesize_speech, chunk, lang))
+            for chunk in chunks
+        ))
+        # MP3 is a stream of frames, so the parts can simply be concatenated
+        audio = b"".join(parts)
+
+        try:
+            await asyncio.to_thread(_write_atomic, self._path(key), audio)
+        except OSError as e:
+            logger.error(f"TTS cache write error: {e}")
+            return audio
+
+        self._forget(key)
+        now = int(time.time())
+        self.index[key] = {"size": len(audio), "created": now, "used": now}
+        self.total_bytes += len(audio)
+        await self._evict()
+        await self._save_index()
+        return audio
+
+    def _chunks(self, text: str) -> List[str]:
+        chunks = []
+        current = ""
+        for segment, separator in split_segments(text, self.chunk_chars):
+            if current and len(current) + len(segment) > self.chunk_chars:
+                chunks.append(current.strip())
+                current = ""
+            current += segment + separator
+        if current.strip():
+            chunks.append(current.strip())
+        return chunks or [text]
+
+    def _forget(self, key: str):
+        entry = self.index.pop(key, None)
+        if entry:
+            self.total_bytes -= entry["size"]
+
+    async def _evict(self):
+        """Drop expired files, then least recently used ones until under max_bytes"""
+        expired_before = time.time() - self.ttl
+        victims = [key for key, entry in self.index.items() if entry["created"] < expired_before]
+        for key in victims:
+            self._forget(key)
+
+        while self.total_bytes > self.max_bytes and self.index:
+            key = next(iter(self.index))
+            self._forget(key)
+            victims.append(key)
+
+        if victims:
+            metrics.incr("tts.cache.evicted", len(victims))
+            await asyncio.to_thread(_remove, [self._path(key) for key in victims])
+
+tts = TTSService()